@@ -0,0 +1,56 @@
+"""add cart item unique product
+
+Revision ID: 0a9c3e7d5b21
+Revises: f6b2d8a4e1c7
+Create Date: 2026-10-17 23:41:17.290583
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0a9c3e7d5b21"
+down_revision: Union[str, Sequence[str], None] = "f6b2d8a4e1c7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate lines into the oldest one per (user, product) first
+    op.execute("UPDATE cartitem SET quantity = 1 WHERE quantity IS NULL")
+    op.execute(
+        """
+        UPDATE cartitem AS keep
+        SET quantity = dup.total
+        FROM (
+            SELECT min(id) AS id, sum(quantity) AS total
+            FROM cartitem
+            GROUP BY user_id, product_id
+            HAVING count(*) > 1
+        ) AS dup
+        WHERE keep.id = dup.id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cartitem AS extra
+        USING cartitem AS keep
+        WHERE extra.user_id = keep.user_id
+          AND extra.product_id = keep.product_id
+          AND extra.id > keep.id
+        """
+    )
+    op.alter_column("cartitem", "quantity", existing_type=sa.Integer(), nullable=False)
+    op.create_unique_constraint(
+        "uq_cartitem_user_product", "cartitem", ["user_id", "product_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_cartitem_user_product", "cartitem", type_="unique")
+    op.alter_column("cartitem", "quantity", existing_type=sa.Integer(), nullable=True)
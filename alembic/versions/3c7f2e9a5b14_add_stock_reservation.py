@@ -0,0 +1,55 @@
+"""add stock reservation
+
+Revision ID: 3c7f2e9a5b14
+Revises: a61d5f0c8e24
+Create Date: 2026-10-17 16:21:37.402915
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "3c7f2e9a5b14"
+down_revision: Union[str, Sequence[str], None] = "a61d5f0c8e24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stockreservation",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_ref", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_stockreservation_order_ref"),
+        "stockreservation",
+        ["order_ref"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_stockreservation_expires_at"),
+        "stockreservation",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_stockreservation_expires_at"), table_name="stockreservation")
+    op.drop_index(op.f("ix_stockreservation_order_ref"), table_name="stockreservation")
+    op.drop_table("stockreservation")
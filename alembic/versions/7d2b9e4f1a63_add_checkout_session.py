@@ -0,0 +1,63 @@
+"""add checkout session
+
+Revision ID: 7d2b9e4f1a63
+Revises: 3c7f2e9a5b14
+Create Date: 2026-10-17 18:04:12.583190
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2b9e4f1a63"
+down_revision: Union[str, Sequence[str], None] = "3c7f2e9a5b14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "checkoutsession",
+        sa.Column("order_ref", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("token", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("cart_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("prices", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("open", "completed", name="checkoutstatus"),
+            nullable=False,
+        ),
+        sa.Column("order_ids", postgresql.JSONB(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("order_ref"),
+    )
+    op.create_index(
+        op.f("ix_checkoutsession_user_id"),
+        "checkoutsession",
+        ["user_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_checkoutsession_expires_at"),
+        "checkoutsession",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_checkoutsession_expires_at"), table_name="checkoutsession")
+    op.drop_index(op.f("ix_checkoutsession_user_id"), table_name="checkoutsession")
+    op.drop_table("checkoutsession")
+    sa.Enum(name="checkoutstatus").drop(op.get_bind(), checkfirst=True)
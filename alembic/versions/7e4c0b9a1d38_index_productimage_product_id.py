@@ -0,0 +1,32 @@
+"""index productimage product_id
+
+Revision ID: 7e4c0b9a1d38
+Revises: c5a83e1f9b06
+Create Date: 2026-10-17 12:40:55.017442
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e4c0b9a1d38"
+down_revision: Union[str, Sequence[str], None] = "c5a83e1f9b06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_productimage_product_id"),
+        "productimage",
+        ["product_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_productimage_product_id"), table_name="productimage")
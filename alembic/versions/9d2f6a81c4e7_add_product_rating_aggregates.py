@@ -0,0 +1,63 @@
+"""add product rating aggregates
+
+Revision ID: 9d2f6a81c4e7
+Revises: 4b1e9c7d2a53
+Create Date: 2026-10-17 10:03:27.904116
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9d2f6a81c4e7"
+down_revision: Union[str, Sequence[str], None] = "4b1e9c7d2a53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "product",
+        sa.Column("rating_sum", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "product",
+        sa.Column("rating_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "product",
+        sa.Column(
+            "rating_avg",
+            sa.Float(),
+            sa.Computed(
+                "CASE WHEN rating_count > 0 "
+                "THEN rating_sum::float / rating_count ELSE 0 END",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    # Backfill from existing reviews
+    op.execute(
+        """
+        UPDATE product
+        SET rating_sum = totals.rating_sum, rating_count = totals.rating_count
+        FROM (
+            SELECT product_id, SUM(rating) AS rating_sum, COUNT(id) AS rating_count
+            FROM review
+            GROUP BY product_id
+        ) AS totals
+        WHERE product.id = totals.product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("product", "rating_avg")
+    op.drop_column("product", "rating_count")
+    op.drop_column("product", "rating_sum")
@@ -0,0 +1,30 @@
+"""add store coordinates
+
+Revision ID: 9e1c4a7b2d58
+Revises: 7d2b9e4f1a63
+Create Date: 2026-10-17 19:12:48.207314
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9e1c4a7b2d58"
+down_revision: Union[str, Sequence[str], None] = "7d2b9e4f1a63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("store", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("store", sa.Column("longitude", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("store", "longitude")
+    op.drop_column("store", "latitude")
@@ -0,0 +1,58 @@
+"""add category path
+
+Revision ID: a61d5f0c8e24
+Revises: 7e4c0b9a1d38
+Create Date: 2026-10-17 14:02:18.661730
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "a61d5f0c8e24"
+down_revision: Union[str, Sequence[str], None] = "7e4c0b9a1d38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "category",
+        sa.Column("path", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.execute(
+        """
+        WITH RECURSIVE tree AS (
+            SELECT id, '/' || id || '/' AS path
+            FROM category
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, tree.path || c.id || '/'
+            FROM category c
+            JOIN tree ON c.parent_id = tree.id
+        )
+        UPDATE category SET path = tree.path FROM tree WHERE category.id = tree.id
+        """
+    )
+    op.create_index(
+        "ix_category_path",
+        "category",
+        ["path"],
+        unique=False,
+        postgresql_ops={"path": "text_pattern_ops"},
+    )
+    op.create_index(
+        op.f("ix_product_category_id"), "product", ["category_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_product_category_id"), table_name="product")
+    op.drop_index("ix_category_path", table_name="category")
+    op.drop_column("category", "path")
@@ -0,0 +1,36 @@
+"""add order history indexes
+
+Revision ID: b4f8d2e6c9a1
+Revises: 9e1c4a7b2d58
+Create Date: 2026-10-17 20:03:26.918442
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4f8d2e6c9a1"
+down_revision: Union[str, Sequence[str], None] = "9e1c4a7b2d58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_order_user_created_at_id",
+        "order",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_orderitem_order_id"), "orderitem", ["order_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_orderitem_order_id"), table_name="orderitem")
+    op.drop_index("ix_order_user_created_at_id", table_name="order")
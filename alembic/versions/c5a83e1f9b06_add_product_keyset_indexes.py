@@ -0,0 +1,50 @@
+"""add product keyset indexes
+
+Revision ID: c5a83e1f9b06
+Revises: 9d2f6a81c4e7
+Create Date: 2026-10-17 11:21:09.552871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a83e1f9b06"
+down_revision: Union[str, Sequence[str], None] = "9d2f6a81c4e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_product_active_created_at_id",
+        "product",
+        ["created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("is_active"),
+    )
+    op.create_index(
+        "ix_product_active_price_id",
+        "product",
+        ["price", "id"],
+        unique=False,
+        postgresql_where=sa.text("is_active"),
+    )
+    op.create_index(
+        "ix_product_active_rating_avg_id",
+        "product",
+        ["rating_avg", "id"],
+        unique=False,
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_active_rating_avg_id", table_name="product")
+    op.drop_index("ix_product_active_price_id", table_name="product")
+    op.drop_index("ix_product_active_created_at_id", table_name="product")
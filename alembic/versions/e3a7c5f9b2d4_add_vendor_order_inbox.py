@@ -0,0 +1,52 @@
+"""add vendor order inbox
+
+Revision ID: e3a7c5f9b2d4
+Revises: b4f8d2e6c9a1
+Create Date: 2026-10-17 21:10:54.371806
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a7c5f9b2d4"
+down_revision: Union[str, Sequence[str], None] = "b4f8d2e6c9a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_order_store_status_created_at_id",
+        "order",
+        ["store_id", "status", "created_at", "id"],
+        unique=False,
+    )
+    op.create_table(
+        "storeordercounter",
+        sa.Column("store_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="orderstatus", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["store_id"], ["store.id"]),
+        sa.PrimaryKeyConstraint("store_id", "status"),
+    )
+    # Seed the counters from the orders placed so far
+    op.execute(
+        "INSERT INTO storeordercounter (store_id, status, count) "
+        'SELECT store_id, status, count(*) FROM "order" GROUP BY store_id, status'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("storeordercounter")
+    op.drop_index("ix_order_store_status_created_at_id", table_name="order")
@@ -0,0 +1,68 @@
+"""add order events and outbox
+
+Revision ID: f6b2d8a4e1c7
+Revises: e3a7c5f9b2d4
+Create Date: 2026-10-17 22:18:05.642719
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f6b2d8a4e1c7"
+down_revision: Union[str, Sequence[str], None] = "e3a7c5f9b2d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    order_status = postgresql.ENUM(name="orderstatus", create_type=False)
+    op.create_table(
+        "orderevent",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("from_status", order_status, nullable=True),
+        sa.Column("to_status", order_status, nullable=False),
+        sa.Column("actor_id", sa.Integer(), nullable=True),
+        sa.Column("note", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["actor_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["order_id"], ["order.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_orderevent_order_id"), "orderevent", ["order_id"], unique=False
+    )
+    op.create_table(
+        "outboxmessage",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("topic", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_outboxmessage_pending",
+        "outboxmessage",
+        ["available_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_outboxmessage_pending", table_name="outboxmessage")
+    op.drop_table("outboxmessage")
+    op.drop_index(op.f("ix_orderevent_order_id"), table_name="orderevent")
+    op.drop_table("orderevent")
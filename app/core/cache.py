@@ -0,0 +1,188 @@
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+class CacheBackend(ABC):
+    """
+    Storage interface for the response cache. Values must be JSON-serializable.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]: ...
+
+    @abstractmethod
+    async def set(
+        self, key: str, value: Any, ttl: int, tags: Iterable[str]
+    ) -> None: ...
+
+    @abstractmethod
+    async def invalidate_tags(self, tags: Iterable[str]) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL and a tag -> keys index.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = (
+            OrderedDict()
+        )
+        self._tags: Dict[str, Set[str]] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int, tags: Iterable[str]) -> None:
+        if key in self._entries:
+            self._drop(key)
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in self._tags.pop(tag, set()):
+                self._drop(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCache(CacheBackend):
+    """
+    Backend for any client speaking the redis.asyncio API (redis, fakeredis, ...).
+    Tags are stored as Redis sets of keys.
+    """
+
+    def __init__(self, client, prefix: str = "soko:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: int, tags: Iterable[str]) -> None:
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, json.dumps(value), ex=ttl)
+        for tag in tags:
+            pipe.sadd(self._tag_key(tag), self.prefix + key)
+        await pipe.execute()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            keys = await self.client.smembers(self._tag_key(tag))
+            await self.client.delete(self._tag_key(tag), *keys)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+
+class ResponseCache:
+    """
+    Front for a CacheBackend that keeps hit/miss counters.
+    """
+
+    def __init__(self, backend: CacheBackend, default_ttl: int):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(
+        self, key: str, value: Any, tags: Iterable[str] = (), ttl: Optional[int] = None
+    ) -> None:
+        await self.backend.set(key, value, ttl or self.default_ttl, tags)
+
+    async def invalidate(self, *tags: str) -> None:
+        self.invalidations += 1
+        await self.backend.invalidate_tags(tags)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+def make_cache_key(namespace: str, params: Any = None) -> str:
+    """
+    Builds a stable key from a namespace and JSON-serializable parameters.
+    """
+    if params is None:
+        return namespace
+    raw = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def build_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        if not settings.REDIS_URL:
+            raise RuntimeError("CACHE_BACKEND=redis requires REDIS_URL")
+        return RedisCache(redis_asyncio.from_url(settings.REDIS_URL))
+    return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+# Shared cache for public catalog reads
+catalog_cache = ResponseCache(build_backend(), default_ttl=settings.CACHE_TTL_SECONDS)
+
+# Authenticated user snapshots; always in-process so a hit costs no round trip
+user_cache = ResponseCache(
+    MemoryCache(max_entries=settings.USER_CACHE_MAX_ENTRIES),
+    default_ttl=settings.USER_CACHE_TTL_SECONDS,
+)
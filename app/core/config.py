@@ -1,4 +1,5 @@
 import os  # noqa: F401
+from typing import List, Optional
 from dotenv import load_dotenv
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
@@ -30,6 +31,83 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = Field(..., env="POSTGRES_PORT")
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
     GOOGLE_USER_DEFAULT_PASSWORD: str = Field(..., env="GOOGLE_USER_DEFAULT_PASSWORD")
+    # OAuth client id Google ID tokens must be issued for (their "aud")
+    GOOGLE_CLIENT_ID: Optional[str] = None
+
+    # Argon2 password hashing; raising a cost rehashes passwords on next login.
+    # Hashing runs on a pool of PASSWORD_HASH_CONCURRENCY threads.
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65_536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_CONCURRENCY: int = 4
+
+    # Catalog cache settings ("memory" or "redis")
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 10_000
+    REDIS_URL: Optional[str] = None
+
+    # Product facets: price bucket lower bounds and how many of the biggest
+    # categories get their facet results cached
+    PRICE_FACET_BOUNDARIES: List[float] = [
+        0,
+        10_000,
+        50_000,
+        100_000,
+        500_000,
+        1_000_000,
+    ]
+    FACET_CACHE_TOP_CATEGORIES: int = 20
+
+    # Per-process cache of authenticated user snapshots; the TTL bounds how
+    # long another worker's change to a user can go unnoticed
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 50_000
+    # Per-process cache of effective permissions; a permission revoked in the
+    # database keeps passing require_permission for up to this long
+    PERMISSION_CACHE_TTL_SECONDS: int = 60
+
+    # How long checkout_confirm holds prices and stock for place_order, and
+    # how often expired holds are handed back
+    STOCK_RESERVATION_TTL_SECONDS: int = 900
+    RESERVATION_SWEEP_INTERVAL_SECONDS: int = 60
+    # Completed checkouts are kept this long so retried place_orders replay
+    CHECKOUT_SESSION_RETENTION_SECONDS: int = 86_400
+
+    # Outbox drainer: how often it polls, messages per batch, and attempts
+    # before a failing message is given up on
+    OUTBOX_DRAIN_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 8
+
+    # Outgoing mail. Without SMTP_HOST mails are only logged (development).
+    # Localhost testing: SMTP_HOST=localhost SMTP_PORT=8025 SMTP_STARTTLS=false
+    # against `python -m aiosmtpd -n -l localhost:8025`
+    SMTP_HOST: Optional[str] = None
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_STARTTLS: bool = True
+    SMTP_USE_SSL: bool = False
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    MAIL_FROM: str = "AfricaSoko <no-reply@africasoko.com>"
+    MAIL_BRAND: str = "AfricaSoko"
+    # Concurrent senders, each with its own reused SMTP connection, and how
+    # many queued mails one sender ships per connection round
+    MAIL_SENDERS: int = 2
+    MAIL_BATCH_SIZE: int = 20
+    MAIL_QUEUE_MAX_SIZE: int = 10_000
+    MAIL_MAX_ATTEMPTS: int = 5
+
+    # Cached cart summaries; price changes drop them sooner via product tags
+    CART_SUMMARY_TTL_SECONDS: int = 600
+
+    # Shipping quoted by checkout_data, per store: base fee + rate * km
+    SHIPPING_BASE_FEE: float = 0.0
+    SHIPPING_RATE_PER_KM: float = 0.5
+
+    # Max age of the in-memory category tree when another worker changed it
+    CATEGORY_TREE_TTL_SECONDS: int = 300
 
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
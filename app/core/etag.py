@@ -0,0 +1,30 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag from the resource's updated_at and a fingerprint of its
+    content (raw column values, not the serialized body).
+    """
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Evaluates If-None-Match against the current ETag (weak comparison, per RFC 9110).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+import httpx
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenError(Exception):
+    """
+    The ID token is malformed, wrongly signed, expired or not meant for us.
+    """
+
+
+# ------------------------------------------------------------
+# Key sources
+# ------------------------------------------------------------
+class KeySource(ABC):
+    """
+    Where the verifier gets its JWKS from. fetch() returns the key set and
+    how long it may be cached, in seconds (None when unknown).
+    """
+
+    @abstractmethod
+    async def fetch(self) -> Tuple[dict, Optional[int]]: ...
+
+
+class HttpKeySource(KeySource):
+    """
+    Google's published signing keys, cached for the Cache-Control max-age.
+    One client is kept for the life of the process so refreshes reuse the
+    TLS connection.
+    """
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def fetch(self) -> Tuple[dict, Optional[int]]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        response = await self._client.get(self.url)
+        response.raise_for_status()
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        return response.json(), int(match.group(1)) if match else None
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class StaticKeySource(KeySource):
+    """
+    A fixed key set, e.g. a locally generated one for tests.
+    """
+
+    def __init__(self, jwks: dict, max_age: Optional[int] = None):
+        self.jwks = jwks
+        self.max_age = max_age
+
+    async def fetch(self) -> Tuple[dict, Optional[int]]:
+        return self.jwks, self.max_age
+
+
+# ------------------------------------------------------------
+# Verifier
+# ------------------------------------------------------------
+class GoogleTokenVerifier:
+    """
+    Verifies Google ID tokens offline against a cached JWKS.
+
+    Keys are fetched on first use and then refreshed in the background
+    `refresh_margin` seconds before they expire (see start()). A token
+    signed with an unknown kid triggers one immediate refresh, which covers
+    key rotation between scheduled refreshes.
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str],
+        key_source: KeySource,
+        default_max_age: int = 3600,
+        refresh_margin: int = 300,
+        retry_after: int = 30,
+    ):
+        self.client_id = client_id
+        self.key_source = key_source
+        self.default_max_age = default_max_age
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+
+    def _expired(self) -> bool:
+        return not self._keys or time.monotonic() >= self._expires_at
+
+    def _recently_fetched(self) -> bool:
+        return time.monotonic() - self._fetched_at < self.retry_after
+
+    async def refresh(self, only_if_expired: bool = False) -> None:
+        async with self._lock:
+            # Requests that queued up on the lock reuse the fetch they waited on
+            if only_if_expired and not self._expired():
+                return
+            jwks, max_age = await self.key_source.fetch()
+            self._keys = {key["kid"]: key for key in jwks.get("keys", [])}
+            self._fetched_at = time.monotonic()
+            self._expires_at = self._fetched_at + (max_age or self.default_max_age)
+
+    async def _key_for(self, kid: Optional[str]) -> dict:
+        if self._expired():
+            await self.refresh(only_if_expired=True)
+        key = self._keys.get(kid)
+        if key is None and not self._recently_fetched():
+            # Google may have rotated keys since the last fetch; throttled so
+            # tokens with made-up kids can't make us hammer the endpoint
+            await self.refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            raise GoogleTokenError("Unknown signing key")
+        return key
+
+    async def verify(self, token: str) -> dict:
+        """
+        Returns the claims of a valid ID token, raises GoogleTokenError otherwise.
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError:
+            raise GoogleTokenError("Malformed token")
+
+        try:
+            key = await self._key_for(header.get("kid"))
+        except (httpx.HTTPError, ValueError):
+            raise GoogleTokenError("Google signing keys are unavailable")
+
+        try:
+            return jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                audience=self.client_id,
+                issuer=GOOGLE_ISSUERS,
+                options={
+                    "verify_aud": self.client_id is not None,
+                    "verify_at_hash": False,
+                    "require_exp": True,
+                },
+            )
+        except JWTError as exc:
+            raise GoogleTokenError(str(exc))
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            delay = self._expires_at - time.monotonic() - self.refresh_margin
+            if self._keys:
+                # Short-lived key sets are still refreshed at a sane pace
+                delay = max(delay, self.retry_after)
+            await asyncio.sleep(max(delay, 0))
+            try:
+                await self.refresh()
+            except Exception:
+                logger.warning("Refreshing Google signing keys failed", exc_info=True)
+                await asyncio.sleep(self.retry_after)
+
+    def start(self) -> None:
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        if isinstance(self.key_source, HttpKeySource):
+            await self.key_source.aclose()
+
+
+google_verifier = GoogleTokenVerifier(
+    client_id=settings.GOOGLE_CLIENT_ID, key_source=HttpKeySource()
+)
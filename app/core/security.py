@@ -1,6 +1,21 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from app.core.config import settings
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+T = TypeVar("T")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -9,3 +24,82 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    """
+    Runs Argon2 on a dedicated thread pool so hashing never blocks the event
+    loop. argon2-cffi releases the GIL, so the threads hash in parallel.
+    At most `concurrency` operations run at once; the rest wait in line and
+    are counted in stats().
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="argon2"
+        )
+        self._slots = asyncio.Semaphore(concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rehashed = 0
+        self.total_wait = 0.0
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        queued_at = time.monotonic()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.total_wait += time.monotonic() - queued_at
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verifies a password; when it matches but was hashed with outdated
+        parameters, also returns a fresh hash for the caller to store.
+        """
+        valid, new_hash = await self._run(
+            pwd_context.verify_and_update, plain_password, hashed_password
+        )
+        if new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "rehashed": self.rehashed,
+            "avg_wait_ms": (
+                self.total_wait / self.completed * 1000 if self.completed else 0.0
+            ),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(concurrency=settings.PASSWORD_HASH_CONCURRENCY)
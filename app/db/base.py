@@ -2,8 +2,16 @@ from sqlmodel import SQLModel
 
 
 from app.models.product import Product, Category, Review  # noqa: F401
-from app.models.order import Order, OrderItem  # noqa: F401
+from app.models.order import (  # noqa: F401
+    CheckoutSession,
+    Order,
+    OrderEvent,
+    OrderItem,
+    StoreOrderCounter,
+)
 from app.models.vendor import Vendor  # noqa: F401
+from app.models.inventory import StockReservation  # noqa: F401
+from app.models.outbox import OutboxMessage  # noqa: F401
 from app.models.wishlist_and_cart import WishlistItem, CartItem  # noqa: F401
 
 # Alembic MetaData object for autogenerate
@@ -1,7 +1,11 @@
+from sqlalchemy import text
+
 from app.db.session import engine
 from app.db.base import Base
 
 
 async def init_db():
     async with engine.begin() as conn:
+        # Needed by the trigram indexes on product name/description
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
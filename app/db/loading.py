@@ -0,0 +1,22 @@
+from typing import List
+
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+
+def load_profile(*relationships) -> List[LoaderOption]:
+    """
+    Loader options for a query that needs exactly `relationships` and nothing else.
+
+    Each listed relationship (a class attribute such as Store.vendor) is loaded
+    with one extra SELECT ... IN; every other relationship raises if touched,
+    so a response that quietly starts walking the object graph fails loudly
+    instead of fanning out into the catalog. Example:
+
+        select(Store).options(*load_profile(Store.vendor))
+    """
+    return [selectinload(rel) for rel in relationships] + [raiseload("*")]
+
+
+# Column attributes only; for read endpoints whose schema has no nested objects.
+LEAN = load_profile()
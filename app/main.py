@@ -1,9 +1,17 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from app.core.cache import catalog_cache, user_cache
+from app.core.config import settings
+from app.core.google_auth import google_verifier
+from app.core.security import password_hasher
 from app.db.init_db import init_db
+from app.tasks.checkout_sweeper import sweep_expired_checkouts
+from app.tasks.outbox_drainer import drain_outbox_forever
+from app.tasks.send_mail import mail_queue
 from app.routers import (
     auth,
     vendor,
@@ -19,6 +27,7 @@ from app.routers import (
     chats,
     orders,
     addresses,
+    cart,
 )
 
 
@@ -31,7 +40,22 @@ origins = [
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    google_verifier.start()
+    checkout_sweeper = asyncio.create_task(
+        sweep_expired_checkouts(settings.RESERVATION_SWEEP_INTERVAL_SECONDS)
+    )
+    mail_queue.start()
+    outbox_drainer = asyncio.create_task(
+        drain_outbox_forever(
+            settings.OUTBOX_DRAIN_INTERVAL_SECONDS, settings.OUTBOX_BATCH_SIZE
+        )
+    )
     yield
+    outbox_drainer.cancel()
+    await mail_queue.stop()
+    checkout_sweeper.cancel()
+    await google_verifier.stop()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -68,6 +92,31 @@ app.include_router(stories.router)
 app.include_router(chats.router)
 app.include_router(orders.router)
 app.include_router(addresses.router, prefix="/addresses", tags=["Addresses"])
+app.include_router(cart.router)
+
+
+@app.get("/metrics/cache", tags=["Metrics"])
+async def cache_metrics():
+    """
+    Hit/miss counters of the catalog response cache and the user snapshot cache.
+    """
+    return {"catalog": catalog_cache.stats(), "users": user_cache.stats()}
+
+
+@app.get("/metrics/password-hashing", tags=["Metrics"])
+async def password_hashing_metrics():
+    """
+    Concurrency and queue depth of the Argon2 hashing pool.
+    """
+    return password_hasher.stats()
+
+
+@app.get("/metrics/mail", tags=["Metrics"])
+async def mail_metrics():
+    """
+    Sent/retried/failed counters and backlog of the outbound mail queue.
+    """
+    return mail_queue.stats()
 
 
 @app.websocket("/online_status")
@@ -0,0 +1,19 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class StockReservation(SQLModel, table=True):
+    """
+    Stock held for a checkout between checkout_confirm and place_order. The
+    quantity is already taken off Product.stock; it is handed back when the
+    reservation expires unused.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    order_ref: str = Field(nullable=False, index=True)
+    user_id: int = Field(foreign_key="user.id")
+    product_id: int = Field(foreign_key="product.id")
+    quantity: int = Field(nullable=False)
+    expires_at: datetime = Field(nullable=False, index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
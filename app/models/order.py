@@ -1,6 +1,8 @@
-from typing import List, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 from datetime import datetime
 from enum import Enum
+from sqlalchemy import Column, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import SQLModel, Field, Relationship
 from .user import User
 from .vendor import Store
@@ -21,6 +23,19 @@ class OrderStatus(str, Enum):
 
 
 class Order(SQLModel, table=True):
+    __table_args__ = (
+        # Order history keyset, see orders_service.order_history
+        Index("ix_order_user_created_at_id", "user_id", "created_at", "id"),
+        # Vendor inbox queues, see orders_service.store_order_inbox
+        Index(
+            "ix_order_store_status_created_at_id",
+            "store_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     store_id: int = Field(foreign_key="store.id")
@@ -58,7 +73,7 @@ class Order(SQLModel, table=True):
 
 class OrderItem(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    order_id: int = Field(foreign_key="order.id")
+    order_id: int = Field(foreign_key="order.id", index=True)
     product_id: int = Field(foreign_key="product.id")
     quantity: int = Field(default=1)
     unit_price: float = Field(default=0.0)
@@ -66,3 +81,59 @@ class OrderItem(SQLModel, table=True):
 
     order: Optional["Order"] = Relationship(back_populates="items")
     product: Optional["Product"] = Relationship()  # type: ignore # noqa: F821
+
+
+class OrderEvent(SQLModel, table=True):
+    """
+    Append-only log of an order's status changes, written by
+    app.services.order_lifecycle in the transaction that makes the change.
+    from_status is None for the event recording the order's creation.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    order_id: int = Field(foreign_key="order.id", index=True)
+    from_status: Optional[OrderStatus] = None
+    to_status: OrderStatus = Field(sa_column_kwargs={"nullable": False})
+    actor_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    note: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class StoreOrderCounter(SQLModel, table=True):
+    """
+    Number of orders per store and status, kept in step with Order.status by
+    orders_service.bump_order_counters so dashboards never COUNT(*) orders.
+    """
+
+    store_id: int = Field(foreign_key="store.id", primary_key=True)
+    status: OrderStatus = Field(primary_key=True)
+    count: int = Field(default=0, nullable=False)
+
+
+class CheckoutStatus(str, Enum):
+    open = "open"
+    completed = "completed"
+
+
+class CheckoutSession(SQLModel, table=True):
+    """
+    A confirmed cart waiting for place_order, keyed by the order_ref handed
+    to the client. Prices are locked at confirmation; once completed, the
+    created order ids are kept so a retried place_order gets the same answer.
+    """
+
+    order_ref: str = Field(primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    token: str = Field(nullable=False)
+    cart_hash: str = Field(nullable=False)
+    # Locked unit price per product id (JSON object keys are strings)
+    prices: Dict[str, float] = Field(
+        default_factory=dict, sa_column=Column(JSONB, nullable=False)
+    )
+    status: CheckoutStatus = Field(
+        default=CheckoutStatus.open, sa_column_kwargs={"nullable": False}
+    )
+    order_ids: Optional[List[int]] = Field(default=None, sa_column=Column(JSONB))
+    expires_at: datetime = Field(nullable=False, index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
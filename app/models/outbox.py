@@ -0,0 +1,34 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from sqlalchemy import Column, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field
+
+
+class OutboxMessage(SQLModel, table=True):
+    """
+    A side effect (email, delivery request, analytics event) recorded in the
+    same transaction as the change that causes it, and carried out later by
+    the outbox drainer so request latency never includes it.
+    """
+
+    __table_args__ = (
+        # The drainer's queue: undelivered messages in due order
+        Index(
+            "ix_outboxmessage_pending",
+            "available_at",
+            "id",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    topic: str = Field(nullable=False)
+    payload: Dict[str, Any] = Field(
+        default_factory=dict, sa_column=Column(JSONB, nullable=False)
+    )
+    attempts: int = Field(default=0, nullable=False)
+    last_error: Optional[str] = None
+    available_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now)
+    processed_at: Optional[datetime] = None
@@ -1,13 +1,54 @@
 from typing import List, Optional
 from datetime import datetime
+from sqlalchemy import Column, Computed, Float, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import SQLModel, Field, Relationship
 from .user import User
 
+# Text search configuration used for the product search vector. "simple" keeps
+# tokens unstemmed so prefix matching behaves predictably for product names.
+SEARCH_CONFIG = "simple"
+
 
 class Product(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_product_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_product_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_product_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+        # Keyset pagination indexes, one per ProductSort key
+        Index(
+            "ix_product_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_product_active_price_id",
+            "price",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_product_active_rating_avg_id",
+            "rating_avg",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     store_id: int = Field(foreign_key="store.id")
-    category_id: int = Field(foreign_key="category.id")
+    category_id: int = Field(foreign_key="category.id", index=True)
     name: str = Field(nullable=False, index=True)
     slug: str = Field(nullable=False, index=True, unique=True)
     description: Optional[str] = None
@@ -17,6 +58,32 @@ class Product(SQLModel, table=True):
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    # Review aggregates, kept in step with the review endpoints
+    rating_sum: int = Field(default=0)
+    rating_count: int = Field(default=0)
+    rating_avg: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            Float,
+            Computed(
+                "CASE WHEN rating_count > 0 "
+                "THEN rating_sum::float / rating_count ELSE 0 END",
+                persisted=True,
+            ),
+        ),
+    )
+    # Maintained by Postgres; name is weighted above description for ranking.
+    search_vector: Optional[str] = Field(
+        default=None,
+        sa_column=Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
 
     store: Optional["Store"] = Relationship(  # noqa: F821 # pyright: ignore[reportUndefinedVariable]
         back_populates="products", sa_relationship_kwargs={"lazy": "joined"}
@@ -33,24 +100,33 @@ class Product(SQLModel, table=True):
 
 
 class Category(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_category_path", "path", postgresql_ops={"path": "text_pattern_ops"}),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(nullable=False, unique=True, index=True)
     slug: str = Field(nullable=False, unique=True, index=True)
     description: Optional[str] = None
     parent_id: Optional[int] = Field(default=None, foreign_key="category.id")
+    # Materialized path of ids from the root, e.g. "/1/5/12/"
+    path: Optional[str] = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    # Never loaded implicitly: a category read must not drag its whole catalog
+    # along. Query products / subtrees explicitly when they are needed.
     children: List["Category"] = Relationship(
-        sa_relationship_kwargs={"remote_side": "Category.id", "lazy": "selectin"}
+        sa_relationship_kwargs={"remote_side": "Category.id", "lazy": "raise"}
     )
     products: List["Product"] = Relationship(
-        back_populates="category", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="category",
+        sa_relationship_kwargs={"lazy": "raise", "passive_deletes": True},
     )
 
 
 class ProductImage(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    product_id: int = Field(foreign_key="product.id")
+    product_id: int = Field(foreign_key="product.id", index=True)
     image_url: str = Field(nullable=False)
     is_main: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.now)
@@ -17,8 +17,9 @@ class Vendor(SQLModel, table=True):
 
     # relationships
     user: Optional["User"] = Relationship(sa_relationship_kwargs={"lazy": "joined"})
+    # Loaded only on request, see app.db.loading.load_profile
     stores: List["Store"] = Relationship(
-        back_populates="vendor", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="vendor", sa_relationship_kwargs={"lazy": "raise"}
     )
 
 
@@ -30,7 +31,11 @@ class Store(SQLModel, table=True):
     description: Optional[str] = None
     logo_url: Optional[str] = None
     is_verified: bool = Field(default=False)
+    # Superseded by the live aggregate in app.services.stores_service
     rating: Optional[float] = Field(default=0.0)
+    # Where orders ship from; used for delivery distance and shipping cost
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
@@ -38,5 +43,5 @@ class Store(SQLModel, table=True):
         back_populates="stores", sa_relationship_kwargs={"lazy": "joined"}
     )
     products: List["Product"] = Relationship(
-        back_populates="store", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="store", sa_relationship_kwargs={"lazy": "raise"}
     )
@@ -2,6 +2,7 @@ from typing import Optional
 from datetime import datetime
 from .product import Product
 from .user import User
+from sqlalchemy import UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -16,10 +17,15 @@ class WishlistItem(SQLModel, table=True):
 
 
 class CartItem(SQLModel, table=True):
+    # One line per product; also serves the lookups by user_id
+    __table_args__ = (
+        UniqueConstraint("user_id", "product_id", name="uq_cartitem_user_product"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     product_id: int = Field(foreign_key="product.id")
-    quantity: int = Field(default=1)
+    quantity: int = Field(default=1, nullable=False)
     added_at: datetime = Field(default_factory=datetime.now)
 
     product: Optional["Product"] = Relationship()
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.session import get_session
-from app.models.user import User, Address
+from app.models.user import Address
+from app.schemas.auth_schema import CurrentUser
 from app.schemas.address_schema import AddressCreate, AddressUpdate, AddressResponse
 from app.routers.auth import get_current_user
 from typing import List
@@ -16,7 +17,7 @@ router = APIRouter(tags=["Addresses"])
 async def create_address(
     address: AddressCreate,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     # If the new address is set as default, unset all other default addresses for the user
     if address.is_default:
@@ -36,7 +37,7 @@ async def create_address(
 @router.get("/addresses/", response_model=List[AddressResponse])
 async def get_addresses(
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     result = await db.execute(select(Address).where(Address.user_id == current_user.id))
     addresses = result.scalars().all()
@@ -47,7 +48,7 @@ async def get_addresses(
 async def get_address(
     address_id: int,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     result = await db.execute(
         select(Address).where(
@@ -65,7 +66,7 @@ async def update_address(
     address_id: int,
     address: AddressUpdate,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     result = await db.execute(
         select(Address).where(
@@ -102,7 +103,7 @@ async def update_address(
 async def delete_address(
     address_id: int,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     result = await db.execute(
         select(Address).where(
@@ -122,7 +123,7 @@ async def delete_address(
 async def set_default_address(
     address_id: int,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     # Unset all other default addresses for the user
     await db.execute(
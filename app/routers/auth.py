@@ -1,16 +1,21 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-from httpx import AsyncClient
 from datetime import datetime
 
 from app.models.user import Role, User, UserRoleLink
-from app.core.security import get_password_hash, verify_password
+from app.core.security import password_hasher
 from app.core.jwt import create_access_token, create_refresh_token, decode_access_token
 from app.db.session import get_session
 from app.core.config import settings
+from app.core.google_auth import GoogleTokenError, google_verifier
+from app.services import outbox_service
+from app.services.permissions_service import permission_engine
+from app.services.users_service import load_current_user
 from app.schemas.auth_schema import (
+    CurrentUser,
     LoginResponse,
     RefreshTokenRequest,
     RefreshTokenResponse,
@@ -21,6 +26,7 @@ from app.schemas.auth_schema import (
 
 router = APIRouter(tags=["auth"])
 security_scheme = HTTPBearer()
+optional_security_scheme = HTTPBearer(auto_error=False)
 
 
 def make_frontend_response(
@@ -40,6 +46,28 @@ def make_frontend_response(
     }
 
 
+async def check_password(session: AsyncSession, db_user: User, password: str) -> bool:
+    """
+    Verifies a login password off the event loop. A hash made with older
+    Argon2 parameters is replaced on the spot.
+    """
+    valid, new_hash = await password_hasher.verify_and_update(
+        password, db_user.hashed_password
+    )
+    if valid and new_hash:
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        await session.commit()
+    return valid
+
+
+async def get_role_name(session: AsyncSession, user_id: int) -> Optional[str]:
+    """
+    The role reported to the frontend, from the cached permission set.
+    """
+    return (await permission_engine.for_user(session, user_id)).primary_role
+
+
 @router.post("")
 async def authenticate(
     request: Request, response: Response, session: AsyncSession = Depends(get_session)
@@ -55,21 +83,12 @@ async def authenticate(
         if not id_token:
             return {"status": "failed", "detail": "No Google ID token provided"}
 
-        # Verify token with Google
-        async with AsyncClient() as client:
-            google_resp = await client.get(
-                "https://oauth2.googleapis.com/tokeninfo",
-                params={"id_token": id_token},
-                timeout=10.0,
-            )
-        if google_resp.status_code != 200:
+        # Verify token against Google's cached signing keys
+        try:
+            tinfo = await google_verifier.verify(id_token)
+        except GoogleTokenError:
             return {"status": "failed", "detail": "Invalid Google ID token"}
 
-        tinfo = google_resp.json()
-        if getattr(settings, "GOOGLE_CLIENT_ID", None):
-            if tinfo.get("aud") != settings.GOOGLE_CLIENT_ID:
-                return {"status": "failed", "detail": "Token audience does not match"}
-
         email = tinfo.get("email")
         username = tinfo.get("name") or tinfo.get("given_name") or "Google User"
         if not email:
@@ -84,7 +103,7 @@ async def authenticate(
             db_user = User(
                 email=email,
                 username=username,
-                hashed_password=get_password_hash(
+                hashed_password=await password_hasher.hash(
                     settings.GOOGLE_USER_DEFAULT_PASSWORD
                 ),
                 is_active=True,
@@ -92,6 +111,10 @@ async def authenticate(
                 created_at=datetime.utcnow(),
             )
             session.add(db_user)
+            await session.flush()
+            await outbox_service.enqueue(
+                session, "user.signed_up", [{"user_id": db_user.id}]
+            )
             await session.commit()
             await session.refresh(db_user)
 
@@ -105,15 +128,8 @@ async def authenticate(
                 if role:
                     session.add(UserRoleLink(user_id=db_user.id, role_id=role.id))
                     await session.commit()
-            else:
-                role = None
-        else:
-            r_q = await session.execute(
-                select(Role)
-                .join(UserRoleLink, Role.id == UserRoleLink.role_id)
-                .where(UserRoleLink.user_id == db_user.id)
-            )
-            role = r_q.scalars().first()
+                    permission_engine.invalidate_user(db_user.id)
+        role_name = await get_role_name(session, db_user.id)
 
         access_token = create_access_token(
             user_id=db_user.id, is_admin=db_user.is_admin
@@ -123,7 +139,7 @@ async def authenticate(
         )
 
         return make_frontend_response(
-            access_token, refresh_token, is_new, role.name if role else None, referee
+            access_token, refresh_token, is_new, role_name, referee
         )
 
     if auth_type == "email":
@@ -140,16 +156,10 @@ async def authenticate(
 
         result = await session.execute(select(User).where(User.email == email))
         db_user = result.scalars().first()
-        if not db_user or not verify_password(password, db_user.hashed_password):
+        if not db_user or not await check_password(session, db_user, password):
             return {"status": "failed", "detail": "Invalid credentials"}
 
-        # Load role
-        r_q = await session.execute(
-            select(Role)
-            .join(UserRoleLink, Role.id == UserRoleLink.role_id)
-            .where(UserRoleLink.user_id == db_user.id)
-        )
-        role = r_q.scalars().first()
+        role_name = await get_role_name(session, db_user.id)
 
         access_token = create_access_token(
             user_id=db_user.id, is_admin=db_user.is_admin
@@ -159,7 +169,7 @@ async def authenticate(
         )
 
         return make_frontend_response(
-            access_token, refresh_token, False, role.name if role else None, referee
+            access_token, refresh_token, False, role_name, referee
         )
 
     if auth_type == "refresh":
@@ -178,18 +188,13 @@ async def authenticate(
         if not db_user:
             return {"status": "failed", "detail": "User not found"}
 
-        r_q = await session.execute(
-            select(Role)
-            .join(UserRoleLink, Role.id == UserRoleLink.role_id)
-            .where(UserRoleLink.user_id == db_user.id)
-        )
-        role = r_q.scalars().first()
+        role_name = await get_role_name(session, db_user.id)
 
         new_access_token = create_access_token(
             user_id=db_user.id, is_admin=db_user.is_admin
         )
         return make_frontend_response(
-            new_access_token, refresh_token, False, role.name if role else None, referee
+            new_access_token, refresh_token, False, role_name, referee
         )
     return {"status": "failed", "detail": "Unsupported auth_type"}
 
@@ -203,16 +208,10 @@ async def login_with_email(
     result = await session.execute(select(User).where(User.email == data.email))
     db_user = result.scalars().first()
 
-    if not db_user or not verify_password(data.password, db_user.hashed_password):
+    if not db_user or not await check_password(session, db_user, data.password):
         raise HTTPException(status_code=400, detail="Invalid email or password")
 
-    # Load user role
-    r_q = await session.execute(
-        select(Role)
-        .join(UserRoleLink, Role.id == UserRoleLink.role_id)
-        .where(UserRoleLink.user_id == db_user.id)
-    )
-    role = r_q.scalars().first()
+    role_name = await get_role_name(session, db_user.id)
 
     # Create tokens
     access_token = create_access_token(user_id=db_user.id, is_admin=db_user.is_admin)
@@ -221,7 +220,7 @@ async def login_with_email(
     return {
         "___access_token": access_token,
         "___refresh_token": refresh_token,
-        "role": role.name if role else None,
+        "role": role_name,
         "is_new": False,
     }
 
@@ -229,17 +228,70 @@ async def login_with_email(
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
     session: AsyncSession = Depends(get_session),
-) -> User:
+) -> CurrentUser:
+    """
+    Cached identity snapshot of the caller; no query on a cache hit.
+    """
     token = credentials.credentials
     payload = decode_access_token(token)
     user_id = int(payload.get("sub"))
-    result = await session.execute(select(User).where(User.id == user_id))
-    db_user = result.scalars().first()
+    current_user = await load_current_user(session, user_id)
+    if not current_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return current_user
+
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(
+        optional_security_scheme
+    ),
+    session: AsyncSession = Depends(get_session),
+) -> Optional[CurrentUser]:
+    """
+    Like get_current_user for endpoints that also serve anonymous callers:
+    None without an Authorization header. A token that is sent must be valid.
+    """
+    if credentials is None:
+        return None
+    return await get_current_user(credentials, session)
+
+
+async def get_current_db_user(
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+) -> User:
+    """
+    The caller as a live ORM User attached to the request session, for
+    handlers that modify it.
+    """
+    db_user = await session.get(User, current_user.id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 
+def require_permission(code: str):
+    """
+    Dependency factory that lets the request through only when the caller
+    holds the permission `code` (e.g. "product:create") through a role or an
+    override. Admins pass every check. No queries on a cache hit:
+
+        @router.post("/", dependencies=[Depends(require_permission("product:create"))])
+    """
+
+    async def check_permission(
+        current_user: CurrentUser = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session),
+    ) -> CurrentUser:
+        if current_user.is_admin:
+            return current_user
+        if not await permission_engine.has_permission(session, current_user.id, code):
+            raise HTTPException(status_code=403, detail=f"Missing permission: {code}")
+        return current_user
+
+    return check_permission
+
+
 @router.post("/refresh_token", response_model=RefreshTokenResponse)
 async def refresh_token(
     request: RefreshTokenRequest, session: AsyncSession = Depends(get_session)
@@ -282,10 +334,13 @@ async def signup(user: UserCreate, session: AsyncSession = Depends(get_session))
     db_user = User(
         email=user.email,
         username=user.username,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await password_hasher.hash(user.password),
         is_admin=user.is_admin,
     )
     session.add(db_user)
+    await session.flush()
+    # Welcome mail goes out via the outbox once the signup commits
+    await outbox_service.enqueue(session, "user.signed_up", [{"user_id": db_user.id}])
     await session.commit()
     await session.refresh(db_user)
     return db_user
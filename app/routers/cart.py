@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_session
+from app.schemas.auth_schema import CurrentUser
+from app.schemas.cart_schema import (
+    CartItemAdd,
+    CartItemUpdate,
+    CartMergeRequest,
+    CartSummary,
+)
+from app.routers.auth import get_current_user
+from app.services import cart_service
+
+router = APIRouter(prefix="/cart", tags=["Cart"])
+
+
+@router.get("", response_model=CartSummary)
+async def get_cart(
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    return await cart_service.get_cart_summary(db, current_user.id)
+
+
+@router.post("/items", response_model=CartSummary)
+async def add_cart_item(
+    item: CartItemAdd,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    await cart_service.check_cart_product(db, item.product_id)
+    await cart_service.add_item(db, current_user.id, item.product_id, item.quantity)
+    await db.commit()
+    await cart_service.invalidate_cart_summary(current_user.id)
+    return await cart_service.get_cart_summary(db, current_user.id)
+
+
+@router.delete("/items/{product_id}", response_model=CartSummary)
+async def remove_cart_item(
+    product_id: int,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # Inactive products can still be removed, so no product lookup here
+    await cart_service.set_quantity(db, current_user.id, product_id, 0)
+    await db.commit()
+    await cart_service.invalidate_cart_summary(current_user.id)
+    return await cart_service.get_cart_summary(db, current_user.id)
+
+
+@router.put("/items/{product_id}", response_model=CartSummary)
+async def update_cart_item(
+    product_id: int,
+    update: CartItemUpdate,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    if update.quantity == 0:
+        return await remove_cart_item(product_id, db, current_user)
+
+    await cart_service.check_cart_product(db, product_id)
+    await cart_service.set_quantity(db, current_user.id, product_id, update.quantity)
+    await db.commit()
+    await cart_service.invalidate_cart_summary(current_user.id)
+    return await cart_service.get_cart_summary(db, current_user.id)
+
+
+@router.post("/merge", response_model=CartSummary)
+async def merge_cart(
+    request: CartMergeRequest,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Folds the cart a guest built before logging in into the user's cart.
+    Products that are gone or inactive are left out and listed in
+    `unavailable`.
+    """
+    skipped = await cart_service.merge_items(db, current_user.id, request.items)
+    await db.commit()
+    await cart_service.invalidate_cart_summary(current_user.id)
+    summary = await cart_service.get_cart_summary(db, current_user.id)
+    summary.unavailable = sorted(set(summary.unavailable) | set(skipped))
+    return summary
+
+
+@router.delete("", response_model=CartSummary)
+async def clear_cart(
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    await cart_service.clear_items(db, current_user.id)
+    await db.commit()
+    await cart_service.invalidate_cart_summary(current_user.id)
+    return CartSummary()
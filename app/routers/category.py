@@ -1,66 +1,138 @@
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import exists
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.cache import catalog_cache, make_cache_key
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.db.loading import LEAN
 from app.db.session import get_session
-from app.models.product import Category
-from app.models.user import User
-from app.schemas.category_schema import CategoryCreate, CategoryRead, CategoryUpdate
-from app.routers.auth import get_current_user
+from app.models.product import Category, Product
+from app.schemas.category_schema import (
+    CategoryCreate,
+    CategoryRead,
+    CategoryTreeNode,
+    CategoryUpdate,
+)
+from app.services.category_tree import (
+    assign_path,
+    category_tree,
+    detach_subtree,
+    move_subtree,
+)
+from app.services.products_service import count_products_by_category
+from app.routers.auth import require_permission
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
-async def get_current_admin_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    if not current_user.is_admin:
-        raise HTTPException(status_code=403, detail="The user is not an administrator")
-    return current_user
+# Admins pass; others need the permission through a role or an override
+manage_categories = require_permission("category:manage")
 
 
 @router.post(
-    "/", response_model=CategoryRead, dependencies=[Depends(get_current_admin_user)]
+    "/", response_model=CategoryRead, dependencies=[Depends(manage_categories)]
 )
 async def create_category(
     category: CategoryCreate, session: AsyncSession = Depends(get_session)
 ):
-    # if category.parent_id:
-    #     # parent_category = await session.get(Category, category.parent_id)  # noqa: F841
-    #     # if not parent_category:
-    #     #     raise HTTPException(
-    #     #         status_code=400,
-    #     #         detail=f"Parent category with id {category.parent_id} not found",
-    #     #     )
     db_category = Category.model_validate(category)
     session.add(db_category)
+    # Also rejects a parent_id that doesn't exist
+    await assign_path(session, db_category)
     await session.commit()
     await session.refresh(db_category)
+    category_tree.invalidate()
+    await catalog_cache.invalidate("categories")
     return db_category
 
 
+async def with_product_counts(
+    session: AsyncSession, categories: List[Category]
+) -> List[CategoryRead]:
+    counts = await count_products_by_category(
+        session, [category.id for category in categories]
+    )
+    reads = []
+    for category in categories:
+        total, active = counts.get(category.id, (0, 0))
+        read = CategoryRead.model_validate(category, from_attributes=True)
+        read.product_count = total
+        read.active_product_count = active
+        reads.append(read)
+    return reads
+
+
 @router.get("/allcategories", response_model=List[CategoryRead])
 async def list_categories(
-    skip: int = 0, limit: int = 10, session: AsyncSession = Depends(get_session)
+    skip: int = 0,
+    limit: int = 10,
+    with_counts: bool = False,
+    session: AsyncSession = Depends(get_session),
 ):
-    result = await session.execute(select(Category).offset(skip).limit(limit))
-    categories = result.scalars().all()
+    cache_key = make_cache_key(
+        "categories:list", {"skip": skip, "limit": limit, "with_counts": with_counts}
+    )
+    cached = await catalog_cache.get(cache_key)
+    if cached is not None:
+        return JSONResponse(cached)
+
+    result = await session.execute(
+        select(Category).options(*LEAN).order_by(Category.id).offset(skip).limit(limit)
+    )
+    rows = result.scalars().all()
+    if with_counts:
+        categories = await with_product_counts(session, rows)
+    else:
+        categories = [
+            CategoryRead.model_validate(category, from_attributes=True)
+            for category in rows
+        ]
+    # Counts move with every product write, so they ride on the products tag too
+    tags = ["categories", "products"] if with_counts else ["categories"]
+    await catalog_cache.set(cache_key, jsonable_encoder(categories), tags=tags)
     return categories
 
 
+@router.get("/tree", response_model=List[CategoryTreeNode])
+async def get_category_tree(session: AsyncSession = Depends(get_session)):
+    """
+    The whole category hierarchy, served from an in-memory snapshot.
+    """
+    return await category_tree.roots(session)
+
+
 @router.get("/{category_id}", response_model=CategoryRead)
-async def get_category(category_id: int, session: AsyncSession = Depends(get_session)):
-    category = await session.get(Category, category_id)
+async def get_category(
+    category_id: int,
+    request: Request,
+    response: Response,
+    with_counts: bool = False,
+    session: AsyncSession = Depends(get_session),
+):
+    category = await session.get(Category, category_id, options=LEAN)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    return category
+
+    if with_counts:
+        (body,) = await with_product_counts(session, [category])
+    else:
+        body = CategoryRead.model_validate(category, from_attributes=True)
+    etag = make_etag(category.updated_at, body.model_dump())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return body
 
 
 @router.put(
     "/{category_id}",
     response_model=CategoryRead,
-    dependencies=[Depends(get_current_admin_user)],
+    dependencies=[Depends(manage_categories)],
 )
 async def update_category(
     category_id: int,
@@ -70,24 +142,24 @@ async def update_category(
     db_category = await session.get(Category, category_id)
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
-    if category.parent_id is not None:
-        parent_category = await session.get(Category, category.parent_id)
-        if not parent_category:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Parent category with id {category.parent_id} not found",
-            )
     category_data = category.model_dump(exclude_unset=True)
+    new_parent_id = category_data.pop("parent_id", db_category.parent_id)
+    if new_parent_id != db_category.parent_id:
+        await move_subtree(session, db_category, new_parent_id)
     for key, value in category_data.items():
         setattr(db_category, key, value)
+    db_category.updated_at = datetime.now()
     session.add(db_category)
     await session.commit()
     await session.refresh(db_category)
+    category_tree.invalidate()
+    # Moves change which products include_descendants listings match
+    await catalog_cache.invalidate("categories", "products")
     return db_category
 
 
 @router.delete(
-    "/{category_id}", status_code=204, dependencies=[Depends(get_current_admin_user)]
+    "/{category_id}", status_code=204, dependencies=[Depends(manage_categories)]
 )
 async def delete_category(
     category_id: int, session: AsyncSession = Depends(get_session)
@@ -95,6 +167,16 @@ async def delete_category(
     category = await session.get(Category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
+    has_products = await session.scalar(
+        select(exists().where(Product.category_id == category_id))
+    )
+    if has_products:
+        raise HTTPException(
+            status_code=409, detail="Category still has products assigned"
+        )
+    await detach_subtree(session, category)
     await session.delete(category)
     await session.commit()
+    category_tree.invalidate()
+    await catalog_cache.invalidate("categories", "products")
     return {"ok": True}
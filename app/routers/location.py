@@ -9,7 +9,7 @@ from app.schemas.location import (
     MessageResponse,
 )
 from app.services import location_service
-from app.models.user import User
+from app.schemas.auth_schema import CurrentUser
 from app.routers.auth import get_current_user
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -19,7 +19,7 @@ router = APIRouter()
 @router.post("/get_user_locations", response_model=List[LocationRead])
 async def get_user_locations_endpoint(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Retrieve all locations for the authenticated user.
@@ -31,7 +31,7 @@ async def get_user_locations_endpoint(
 async def add_user_location_endpoint(
     req: LocationWrapper,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Add a new location for the authenticated user.
@@ -50,7 +50,7 @@ async def add_user_location_endpoint(
 def delete_user_location_endpoint(
     req: LocationWrapper,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Delete a location belonging to the authenticated user.
@@ -1,16 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 from app.db.session import get_session
-from app.models.order import Order, OrderItem
-from app.models.product import Product
-from app.models.user import User, Address
-from app.models.vendor import Store, Vendor
+from app.models.order import Order, OrderEvent, OrderStatus
+from app.models.user import Address
+from app.schemas.auth_schema import CurrentUser
 from app.schemas.order_schema import (
     Order as OrderSchema,
-    OrderHost,
-    OrderProduct,
+    OrderEventRead,
+    OrderFilter,
+    OrderPage,
+    OrderStatusUpdate,
     CheckoutDataRequest,
     CheckoutDataResponse,
     CheckoutConfirmRequest,
@@ -18,11 +18,19 @@ from app.schemas.order_schema import (
     PlaceOrderRequest,
     StatusResponse,
 )
-from typing import List
-import uuid
+from typing import List, Optional, Union
 import logging
 
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user, get_optional_user
+from app.services import cart_service, orders_service
+from app.services.checkout_service import (
+    complete_checkout,
+    open_checkout,
+    quote_checkout,
+)
+from app.services.inventory_service import invalidate_moved_stock
+from app.services.order_lifecycle import transition_order
+from app.services.ownership_service import get_vendor_store_ids
 
 logger = logging.getLogger("checkout_logger")
 logging.basicConfig(level=logging.INFO)
@@ -31,104 +39,48 @@ logging.basicConfig(level=logging.INFO)
 router = APIRouter(tags=["Orders"])
 
 
-# ─── Get all orders for a user ────────────────────────────────────────────────
-@router.post("/get_orders", response_model=List[OrderSchema])
+# ─── Order history for a user ────────────────────────────────────────────────
+@router.post("/get_orders", response_model=Union[List[OrderSchema], OrderPage])
 async def get_orders(
+    filters: Optional[OrderFilter] = None,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Order)
-        .where(Order.user_id == current_user.id)
-        .options(
-            selectinload(Order.items).selectinload(OrderItem.product),
-            selectinload(Order.store)
-            .selectinload(Store.vendor)
-            .selectinload(Vendor.user),
-        )
-    )
-    orders = result.scalars().unique().all()
-
-    order_list = []
-    for o in orders:
-        if not o.store or not o.store.vendor or not o.store.vendor.user:
-            # Skip orders with incomplete host data to prevent errors
-            continue
-
-        host = OrderHost(
-            username=o.store.vendor.user.username or "unknown",
-            profile_pic=o.store.vendor.user.profile_pic,
-            verification="gold" if o.store.is_verified else "bronze",
-        )
-        products = []
-        for item in o.items:
-            if item.product:
-                products.append(
-                    OrderProduct(
-                        title=item.product.name,
-                        thumbnail=(
-                            next(
-                                (
-                                    img.image_url
-                                    for img in item.product.images
-                                    if img.is_main
-                                ),
-                                None,
-                            )
-                            or (
-                                item.product.images[0].image_url
-                                if item.product.images
-                                else ""
-                            )
-                        ),
-                        amount=item.quantity,
-                        attributes={},  # Frontend handles attributes display
-                    )
-                )
-        order_list.append(
-            OrderSchema(
-                id=str(o.id),
-                created_at=o.created_at,
-                delivered=o.status == "delivered",
-                ready=o.status in ["paid", "processing", "shipped"],
-                host=host,
-                products=products,
-            )
-        )
-    return order_list
+    """
+    Newest orders first; the body is optional. The whole history as a list
+    by default, one OrderPage at a time with `"pagination": "cursor"`.
+    """
+    filters = filters or OrderFilter()
+    page = await orders_service.order_history(db, current_user.id, filters)
+    if filters.pagination == "cursor":
+        return page
+    return page.items
 
 
 @router.post("/checkout_data", response_model=CheckoutDataResponse)
 async def checkout_data(
     request: CheckoutDataRequest,
     db: AsyncSession = Depends(get_session),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
 ):
-    # Log the received data
-    logger.info("Received checkout request: %s", request.json())
-
+    # Distances and shipping need the buyer's address, so anonymous callers
+    # only get the cart total and the base shipping fee
     cart = request.data
-    if not cart:
-        logger.info("Cart is empty")
-        return CheckoutDataResponse(total=0.0, distances=[])
-
-    total = 0.0
-    for item in cart:
-        logger.info("Processing item: %s", item)
-        result = await db.execute(
-            select(Product).where(Product.id == int(item.product_id))
-        )
-        product = result.scalars().first()
-        if not product:
-            logger.warning("Product %s not found", item.product_id)
-            raise HTTPException(
-                status_code=404, detail=f"Product {item.product_id} not found"
-            )
-        total += product.price * item.quantity
-
-    distances = [0.0, 1.0, 2.0]
-    logger.info("Returning total: %s, distances: %s", total, distances)
-
-    return CheckoutDataResponse(total=total, distances=distances)
+    if not cart and current_user:
+        cart = await cart_service.cart_checkout_items(db, current_user.id)
+    quote = await quote_checkout(
+        db,
+        cart,
+        user_id=current_user.id if current_user else None,
+        location_index=request.location_index,
+    )
+    logger.info(
+        "Checkout quote: total %s, shipping %s, distances %s",
+        quote.total,
+        quote.shipping,
+        quote.distances,
+    )
+    return quote
 
 
 # ─── Checkout Confirm ────────────────────────────────────────────────────────
@@ -136,12 +88,18 @@ async def checkout_data(
 async def checkout_confirm(
     request: CheckoutConfirmRequest,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    order_ref = str(uuid.uuid4())
-    token = str(uuid.uuid4())
-
-    return CheckoutConfirmResponse(status="success", order=order_ref, token=token)
+    # An empty cart in the request means "my stored cart"
+    cart = request.data or await cart_service.cart_checkout_items(db, current_user.id)
+    # Locks prices and holds stock until place_order or expiry
+    checkout = await open_checkout(db, current_user.id, cart)
+    await db.commit()
+    await invalidate_moved_stock(db)
+
+    return CheckoutConfirmResponse(
+        status="success", order=checkout.order_ref, token=checkout.token
+    )
 
 
 # ─── Place Order ─────────────────────────────────────────────────────────────
@@ -149,15 +107,16 @@ async def checkout_confirm(
 async def place_order(
     request: PlaceOrderRequest,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     # Fetch user
     user = current_user
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not request.cart:
-        raise HTTPException(status_code=400, detail="Cart is empty")
+    # No empty-cart check here: a retry after success must still replay,
+    # although the stored cart was cleared by the first attempt
+    cart = request.cart or await cart_service.cart_checkout_items(db, user.id)
 
     # Fetch the user's default shipping address
     default_address_result = await db.execute(
@@ -172,48 +131,112 @@ async def place_order(
 
     shipping_address_id = default_address.id if default_address else None
 
-    # Group items by store
-    store_products = {}
-    for item in request.cart:
-        result = await db.execute(
-            select(Product).where(Product.id == int(item.product_id))
-        )
-        product = result.scalars().first()
-        if not product:
-            raise HTTPException(
-                status_code=404, detail=f"Product {item.product_id} not found"
-            )
-        if product.store_id not in store_products:
-            store_products[product.store_id] = []
-        store_products[product.store_id].append((product, item.quantity))
-
-    # Create one order per store
-    for store_id, products_in_store in store_products.items():
-        total_amount = sum(p.price * q for p, q in products_in_store)
-
-        # Create the order
-        order = Order(
-            user_id=user.id,
-            store_id=store_id,
-            status="paid",
-            total_amount=total_amount,
-            grand_total=total_amount,
-            shipping_address_id=shipping_address_id,
-        )
-        db.add(order)
-        await db.commit()
-        await db.refresh(order)
-
-        # Add order items
-        for product, quantity in products_in_store:
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=product.id,
-                quantity=quantity,
-                unit_price=product.price,
-                subtotal=product.price * quantity,
-            )
-            db.add(order_item)
-        await db.commit()
-
-    return StatusResponse(status="success", message="Order(s) placed successfully")
+    # One transaction for every store's order; nothing is left half-created.
+    # A retry of an already placed checkout returns the original orders.
+    order_ids, replayed = await complete_checkout(
+        db,
+        user.id,
+        request.order_ref,
+        request.token,
+        cart,
+        shipping_address_id=shipping_address_id,
+    )
+    if not replayed:
+        # Ordered products leave the stored cart with the same commit
+        ordered = orders_service.cart_quantities(cart)
+        await cart_service.clear_items(db, user.id, ordered)
+    await db.commit()
+    await invalidate_moved_stock(db)
+    await cart_service.invalidate_cart_summary(user.id)
+
+    return StatusResponse(
+        status="success", message="Order(s) placed successfully", orders=order_ids
+    )
+
+
+# ─── Order lifecycle ─────────────────────────────────────────────────────────
+# Store owners run fulfilment; buyers may only cancel before processing starts.
+# Admins can make any allowed transition, e.g. mark an order paid.
+VENDOR_STATUSES = frozenset(
+    {
+        OrderStatus.processing,
+        OrderStatus.shipped,
+        OrderStatus.delivered,
+        OrderStatus.cancelled,
+    }
+)
+BUYER_CANCELLABLE = frozenset({OrderStatus.pending, OrderStatus.paid})
+
+
+async def get_order_parties(db: AsyncSession, order_id: int):
+    result = await db.execute(
+        select(Order.user_id, Order.store_id).where(Order.id == order_id)
+    )
+    parties = result.first()
+    if not parties:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return parties
+
+
+@router.post("/orders/{order_id}/status", response_model=StatusResponse)
+async def update_order_status(
+    order_id: int,
+    update: OrderStatusUpdate,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    (to_status,) = orders_service.order_statuses([update.status])
+    parties = await get_order_parties(db, order_id)
+
+    from_statuses = None
+    if not current_user.is_admin:
+        if parties.store_id in await get_vendor_store_ids(db, current_user.id):
+            if to_status not in VENDOR_STATUSES:
+                raise HTTPException(
+                    status_code=403, detail="Vendors cannot set this status."
+                )
+        elif parties.user_id == current_user.id:
+            if to_status != OrderStatus.cancelled:
+                raise HTTPException(status_code=403, detail="Buyers can only cancel.")
+            from_statuses = BUYER_CANCELLABLE
+        else:
+            raise HTTPException(status_code=404, detail="Order not found")
+
+    await transition_order(
+        db,
+        order_id,
+        to_status,
+        actor_id=current_user.id,
+        note=update.note,
+        from_statuses=from_statuses,
+    )
+    await db.commit()
+    # A cancellation puts the order's stock back
+    await invalidate_moved_stock(db)
+    return StatusResponse(status="success", message=f"Order {to_status.value}")
+
+
+@router.get("/orders/{order_id}/events", response_model=List[OrderEventRead])
+async def get_order_events(
+    order_id: int,
+    db: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Status history of an order, oldest first, for its buyer, the store's
+    vendor or an admin.
+    """
+    parties = await get_order_parties(db, order_id)
+    if not (
+        current_user.is_admin
+        or parties.user_id == current_user.id
+        or parties.store_id in await get_vendor_store_ids(db, current_user.id)
+    ):
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    result = await db.execute(
+        select(OrderEvent)
+        .where(OrderEvent.order_id == order_id)
+        .order_by(OrderEvent.id)
+    )
+    return result.scalars().all()
@@ -1,131 +1,175 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends
+from datetime import datetime
+from typing import List, Union
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.cache import catalog_cache, make_cache_key
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.db.loading import LEAN
 from app.db.session import get_session
 from app.models.product import Product, Category
-from app.models.product import Review
-from app.models.user import User
-from app.models.vendor import Vendor, Store
+from app.schemas.auth_schema import CurrentUser
 from app.schemas.product_shema import (
+    ProductBatchRequest,
+    ProductBatchResponse,
     ProductCreate,
     ProductDisplay,
+    ProductFacets,
     ProductFilter,
+    ProductPage,
     ProductRead,
+    ProductSort,
     ProductUpdate,
 )
 from app.routers.auth import get_current_user
+from app.services.ownership_service import (
+    get_vendor_store_ids,
+    verify_product_owner,
+)
+from app.services.products_service import (
+    apply_product_cursor,
+    apply_product_filters,
+    apply_product_sort,
+    build_product_display,
+    build_product_displays,
+    category_subtree,
+    compute_product_facets,
+    filter_cache_params,
+    load_product_images,
+    product_cursor,
+    product_display_query,
+    search_rank,
+)
 from pydantic import BaseModel
-from sqlalchemy import or_, func
-
-from app.schemas.vendor_schema import VendorInfo
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 
-async def get_vendor_stores(user_id: int, session: AsyncSession) -> List[int]:
-    vendor_result = await session.execute(
-        select(Vendor).where(Vendor.user_id == user_id)
-    )
-    vendor = vendor_result.scalars().first()
-    if not vendor:
-        return []
-
-    stores_result = await session.execute(
-        select(Store).where(Store.vendor_id == vendor.id)
-    )
-    return [store.id for store in stores_result.scalars().all()]
-
-
 # ----------------------
 # Public: List Products
 # ----------------------
-@router.post("/get_products", response_model=List[ProductDisplay])
+@router.post("/get_products", response_model=Union[List[ProductDisplay], ProductPage])
 async def get_products(
     filters: ProductFilter,
     session: AsyncSession = Depends(get_session),
 ):
-    avg_rating_subquery = (
-        select(
-            Review.product_id,
-            func.avg(Review.rating).label("average_rating"),
-        )
-        .group_by(Review.product_id)
-        .subquery()
-    )
+    cache_key = make_cache_key("products:list", filter_cache_params(filters))
+    cached = await catalog_cache.get(cache_key)
+    if cached is not None:
+        return JSONResponse(cached)
+
+    query = product_display_query().where(Product.is_active)
+    subtree = await category_subtree(session, filters)
+    query = apply_product_filters(query, filters, subtree)
+
+    use_cursor = filters.pagination == "cursor"
+    searching = bool(filters.search and filters.search.strip())
+    if use_cursor:
+        sort = filters.sort or ProductSort.newest
+        if filters.cursor:
+            query = apply_product_cursor(query, sort, filters.cursor)
+        query = apply_product_sort(query, sort).limit(filters.limit + 1)
+    else:
+        if filters.sort:
+            query = apply_product_sort(query, filters.sort)
+        elif searching:
+            query = query.order_by(
+                search_rank(filters.search).desc(), Product.id.desc()
+            )
+        else:
+            query = apply_product_sort(query, ProductSort.newest)
+        query = query.offset(filters.skip).limit(filters.limit)
 
-    query = (
-        select(Product, avg_rating_subquery.c.average_rating)
-        .outerjoin(avg_rating_subquery, Product.id == avg_rating_subquery.c.product_id)
-        .where(Product.is_active)
-    )
+    results = await session.execute(query)
+    rows = results.all()
 
-    if filters.store_id:
-        query = query.where(Product.store_id == filters.store_id)
-    if filters.category_id:
-        query = query.where(Product.category_id == filters.category_id)
-    if filters.min_price is not None:
-        query = query.where(Product.price >= filters.min_price)
-    if filters.max_price is not None:
-        query = query.where(Product.price <= filters.max_price)
-    if filters.search:
-        search_term = f"%{filters.search.lower()}%"
-        query = query.where(
-            or_(Product.name.ilike(search_term), Product.description.ilike(search_term))
-        )
+    next_cursor = None
+    if use_cursor and len(rows) > filters.limit:
+        rows = rows[: filters.limit]
+        next_cursor = product_cursor(rows[-1], sort)
 
-    results = await session.execute(query.offset(filters.skip).limit(filters.limit))
-    products_with_ratings = results.all()
+    response = await build_product_displays(session, rows)
+    if use_cursor:
+        response = ProductPage(items=response, next_cursor=next_cursor)
 
-    response = []
-    for product, average_rating in products_with_ratings:
-        vendor_user = (
-            product.store.vendor.user
-            if product.store and product.store.vendor
-            else None
-        )
-        host_info = VendorInfo(
-            id=product.store.vendor.id
-            if product.store and product.store.vendor
-            else None,
-            username=vendor_user.username if vendor_user else "anonymous",
-            profile_pic=vendor_user.profile_pic
-            if vendor_user
-            else "assets/images/faces/user1.jfif",
-            verification="verified"
-            if product.store and product.store.is_verified
-            else "null",
-            address=product.store.store_name if product.store else "N/A",
-        )
+    await catalog_cache.set(cache_key, jsonable_encoder(response), tags=["products"])
+    return response
 
-        product_images = (
-            [img.image_url for img in product.images] if product.images else []
-        )
 
-        response.append(
-            ProductDisplay(
-                id=product.id,
-                title=product.name,
-                price=product.price,
-                discount_price=product.discount_price,
-                stock=product.stock,
-                unit_type="Item",
-                description=product.description,
-                category_id=product.category_id,
-                host_id=product.store.vendor.id
-                if product.store and product.store.vendor
-                else None,
-                images=product_images,
-                host=host_info,
-                created_at=product.created_at,
-                updated_at=product.updated_at,
-                average_rating=float(average_rating)
-                if average_rating is not None
-                else 0.0,
-            )
-        )
-    return response
+# ----------------------
+# Public: Facet counts for the filter sidebar
+# ----------------------
+async def _facets_cacheable(filters: ProductFilter) -> bool:
+    """
+    Facets are cached for the unfiltered catalog and for the biggest
+    categories (taken from the cached unfiltered facets); anything narrower
+    is cheap enough, and too varied, to cache.
+    """
+    if (
+        filters.store_id
+        or filters.min_price is not None
+        or filters.max_price is not None
+        or (filters.search and filters.search.strip())
+    ):
+        return False
+    if not filters.category_id:
+        return True
+    unfiltered = await catalog_cache.get(make_cache_key("products:facets", {}))
+    if unfiltered is None:
+        return False
+    top = unfiltered["categories"][: settings.FACET_CACHE_TOP_CATEGORIES]
+    return any(facet["id"] == filters.category_id for facet in top)
+
+
+@router.post("/facets", response_model=ProductFacets)
+async def get_product_facets(
+    filters: ProductFilter,
+    session: AsyncSession = Depends(get_session),
+):
+    cacheable = await _facets_cacheable(filters)
+    cache_params = {}
+    if filters.category_id:
+        cache_params = {
+            "category_id": filters.category_id,
+            "include_descendants": filters.include_descendants,
+        }
+    cache_key = make_cache_key("products:facets", cache_params)
+    if cacheable:
+        cached = await catalog_cache.get(cache_key)
+        if cached is not None:
+            return JSONResponse(cached)
+
+    subtree = await category_subtree(session, filters)
+    facets = await compute_product_facets(session, filters, subtree)
+    if cacheable:
+        await catalog_cache.set(cache_key, jsonable_encoder(facets), tags=["products"])
+    return facets
+
+
+# ----------------------
+# Public: Get many products by id (cart, wishlist, order history widgets)
+# ----------------------
+@router.post("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    request: ProductBatchRequest,
+    session: AsyncSession = Depends(get_session),
+):
+    # Two queries whatever the batch size: the projection and the image aggregate
+    ids = list(dict.fromkeys(request.ids))
+    result = await session.execute(
+        product_display_query().where(Product.id.in_(ids), Product.is_active)
+    )
+    rows_by_id = {row.id: row for row in result.all()}
+
+    ordered_rows = [rows_by_id[pid] for pid in ids if pid in rows_by_id]
+    items = await build_product_displays(session, ordered_rows)
+    missing = [pid for pid in ids if pid not in rows_by_id]
+    return ProductBatchResponse(items=items, missing=missing)
 
 
 # ----------------------
@@ -134,55 +178,37 @@ async def get_products(
 @router.get("/{product_id}", response_model=ProductDisplay)
 async def get_product(
     product_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
 ):
-    product = await session.get(Product, product_id)
-    if not product or not product.is_active:
-        raise HTTPException(status_code=404, detail="Product not found")
-
-    reviews_result = await session.execute(
-        select(Review).where(Review.product_id == product_id)
+    cache_key = f"products:detail:{product_id}"
+    cached = await catalog_cache.get(cache_key)
+    if cached is not None:
+        if etag_matches(request, cached["etag"]):
+            return not_modified(cached["etag"])
+        return JSONResponse(cached["body"], headers={"ETag": cached["etag"]})
+
+    result = await session.execute(
+        product_display_query().where(Product.id == product_id, Product.is_active)
     )
-    reviews = reviews_result.scalars().all()
-    average_rating = 0.0
-    if reviews:
-        average_rating = sum(r.rating for r in reviews) / len(reviews)
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Product not found")
 
-    vendor_user = (
-        product.store.vendor.user if product.store and product.store.vendor else None
-    )
-    host_info = VendorInfo(
-        id=product.store.vendor.id if product.store and product.store.vendor else None,
-        username=vendor_user.username if vendor_user else "anonymous",
-        profile_pic=vendor_user.profile_pic
-        if vendor_user
-        else "assets/images/faces/user1.jfif",
-        verification="verified"
-        if product.store and product.store.is_verified
-        else "null",
-        address=product.store.store_name if product.store else "N/A",
-    )
+    images = (await load_product_images(session, [product_id])).get(product_id, [])
+    etag = make_etag(row.updated_at, tuple(row), images)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-    product_images = [img.image_url for img in product.images] if product.images else []
-
-    return ProductDisplay(
-        id=product.id,
-        title=product.name,
-        price=product.price,
-        discount_price=product.discount_price,
-        stock=product.stock,
-        unit_type="Item",
-        description=product.description,
-        category_id=product.category_id,
-        host_id=product.store.vendor.id
-        if product.store and product.store.vendor
-        else None,
-        images=product_images,
-        host=host_info,
-        created_at=product.created_at,
-        updated_at=product.updated_at,
-        average_rating=average_rating,
+    display = build_product_display(row, images)
+    await catalog_cache.set(
+        cache_key,
+        {"etag": etag, "body": jsonable_encoder(display)},
+        tags=[f"product:{product_id}", f"store:{row.store_id}"],
     )
+    response.headers["ETag"] = etag
+    return display
 
 
 # ----------------------
@@ -192,12 +218,12 @@ async def get_product(
 async def create_product(
     product: ProductCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     if not current_user.is_vendor:
         raise HTTPException(status_code=403, detail="Only vendors can add products.")
 
-    vendor_stores = await get_vendor_stores(current_user.id, session)
+    vendor_stores = await get_vendor_store_ids(session, current_user.id)
     if not vendor_stores:
         raise HTTPException(
             status_code=403, detail="Not authorized to add products without a store."
@@ -209,8 +235,10 @@ async def create_product(
         )
 
     if product.category_id:
-        category = await session.get(Category, product.category_id)
-        if not category:
+        category_id = await session.scalar(
+            select(Category.id).where(Category.id == product.category_id)
+        )
+        if category_id is None:
             raise HTTPException(
                 status_code=400,
                 detail=f"Category with id {product.category_id} not found",
@@ -220,52 +248,14 @@ async def create_product(
     db_product = Product.model_validate(product)
     session.add(db_product)
     await session.commit()
-    await session.refresh(db_product)
+    await catalog_cache.invalidate("products")
 
     # Prepare display response for frontend
-    vendor_user = (
-        db_product.store.vendor.user
-        if db_product.store and db_product.store.vendor
-        else None
-    )
-    host_info = VendorInfo(
-        id=db_product.store.vendor.id
-        if db_product.store and db_product.store.vendor
-        else None,
-        username=vendor_user.username if vendor_user else "anonymous",
-        profile_pic=vendor_user.profile_pic
-        if vendor_user
-        else "assets/images/faces/user1.jfif",
-        verification="verified"
-        if db_product.store and db_product.store.is_verified
-        else "null",
-        address=db_product.store.store_name if db_product.store else "N/A",
+    result = await session.execute(
+        product_display_query().where(Product.id == db_product.id)
     )
-
-    product_images = (
-        [img.image_url for img in db_product.images] if db_product.images else []
-    )
-
-    response = ProductDisplay(
-        id=db_product.id,
-        title=db_product.name,
-        price=db_product.price,
-        discount_price=db_product.discount_price,
-        stock=db_product.stock,
-        unit_type="Item",
-        description=db_product.description,
-        category_id=db_product.category_id,
-        host_id=db_product.store.vendor.id
-        if db_product.store and db_product.store.vendor
-        else None,
-        images=product_images,
-        host=host_info,
-        created_at=db_product.created_at,
-        updated_at=db_product.updated_at,
-        average_rating=0.0,
-    )
-
-    return response
+    displays = await build_product_displays(session, [result.one()])
+    return displays[0]
 
 
 # ----------------------
@@ -276,28 +266,28 @@ async def update_product(
     product_id: int,
     product_data: ProductUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    db_product = await session.get(Product, product_id)
-    if not db_product or not db_product.is_active:
-        raise HTTPException(status_code=404, detail="Product not found")
-
     if not current_user.is_vendor:
         raise HTTPException(status_code=403, detail="Only vendors can update products.")
 
-    vendor_stores = await get_vendor_stores(current_user.id, session)
-    if db_product.store_id not in vendor_stores:
-        raise HTTPException(
-            status_code=403, detail="Not authorized to update this product."
-        )
+    await verify_product_owner(
+        session,
+        current_user.id,
+        product_id,
+        detail="Not authorized to update this product.",
+    )
+    db_product = await session.get(Product, product_id, options=LEAN)
 
     update_data = product_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_product, key, value)
+    db_product.updated_at = datetime.now()
 
     session.add(db_product)
     await session.commit()
     await session.refresh(db_product)
+    await catalog_cache.invalidate("products", f"product:{product_id}")
     return db_product
 
 
@@ -312,22 +302,22 @@ class DeleteResponse(BaseModel):
 async def delete_product(
     product_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    db_product = await session.get(Product, product_id)
-    if not db_product or not db_product.is_active:
-        raise HTTPException(status_code=404, detail="Product not found")
-
     if not current_user.is_vendor:
         raise HTTPException(status_code=403, detail="Only vendors can delete products.")
 
-    vendor_stores = await get_vendor_stores(current_user.id, session)
-    if db_product.store_id not in vendor_stores:
-        raise HTTPException(
-            status_code=403, detail="Not authorized to delete this product."
-        )
-
-    db_product.is_active = False
-    session.add(db_product)
+    await verify_product_owner(
+        session,
+        current_user.id,
+        product_id,
+        detail="Not authorized to delete this product.",
+    )
+    await session.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(is_active=False, updated_at=datetime.now())
+    )
     await session.commit()
+    await catalog_cache.invalidate("products", f"product:{product_id}")
     return DeleteResponse(detail=f"Product {product_id} deactivated successfully")
@@ -3,40 +3,30 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.cache import catalog_cache
 from app.db.session import get_session
-from app.models.user import User
+from app.schemas.auth_schema import CurrentUser
 from app.models.product import Review, Product
-from app.models.vendor import Vendor, Store
 from app.schemas.product_shema import ReviewCreate, ReviewRead, ReviewUpdate
 from app.routers.auth import get_current_user
+from app.services.ownership_service import owns_product
+from app.services.ratings_service import apply_rating_change
 
 router = APIRouter(tags=["Reviews"])
 
 
-async def get_vendor_stores(user_id: int, session: AsyncSession) -> List[int]:
-    vendor_result = await session.execute(
-        select(Vendor).where(Vendor.user_id == user_id)
-    )
-    vendor = vendor_result.scalars().first()
-    if not vendor:
-        return []
-
-    stores_result = await session.execute(
-        select(Store).where(Store.vendor_id == vendor.id)
-    )
-    return [store.id for store in stores_result.scalars().all()]
-
-
 @router.post("/products/{product_id}/reviews", response_model=ReviewRead)
 async def create_review(
     product_id: int,
     review_data: ReviewCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    # Check if product exists
-    product = await session.get(Product, product_id)
-    if not product:
+    # Check the product exists without loading its reviews and images
+    product = await session.scalar(
+        select(Product.id).where(Product.id == product_id, Product.is_active)
+    )
+    if product is None:
         raise HTTPException(status_code=404, detail="Product not found.")
 
     # A user can only review a product once
@@ -54,7 +44,9 @@ async def create_review(
         review_data, update={"user_id": current_user.id, "product_id": product_id}
     )
     session.add(db_review)
+    await apply_rating_change(session, product_id, db_review.rating, 1)
     await session.commit()
+    await catalog_cache.invalidate("products", f"product:{product_id}")
     await session.refresh(db_review)
     return db_review
 
@@ -77,7 +69,7 @@ async def update_review(
     review_id: int,
     review_data: ReviewUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     db_review = await session.get(Review, review_id)
     if not db_review:
@@ -88,12 +80,18 @@ async def update_review(
             status_code=403, detail="Not authorized to update this review."
         )
 
+    previous_rating = db_review.rating
     update_data = review_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_review, key, value)
 
     session.add(db_review)
+    if db_review.rating != previous_rating:
+        await apply_rating_change(
+            session, db_review.product_id, db_review.rating - previous_rating, 0
+        )
     await session.commit()
+    await catalog_cache.invalidate("products", f"product:{db_review.product_id}")
     await session.refresh(db_review)
     return db_review
 
@@ -102,7 +100,7 @@ async def update_review(
 async def delete_review(
     review_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     db_review = await session.get(Review, review_id)
     if not db_review:
@@ -113,14 +111,9 @@ async def delete_review(
 
     is_owner = db_review.user_id == current_user.id
 
-    is_vendor_of_product = False
-    if current_user.is_vendor:
-        product = await session.get(Product, db_review.product_id)
-        vendor_stores = await get_vendor_stores(
-            current_user.id, session
-        )  # I need this helper function
-        if product and product.store_id in vendor_stores:
-            is_vendor_of_product = True
+    is_vendor_of_product = current_user.is_vendor and await owns_product(
+        session, current_user.id, db_review.product_id
+    )
 
     if not is_owner and not is_vendor_of_product:
         raise HTTPException(
@@ -128,4 +121,6 @@ async def delete_review(
         )
 
     await session.delete(db_review)
+    await apply_rating_change(session, db_review.product_id, -db_review.rating, -1)
     await session.commit()
+    await catalog_cache.invalidate("products", f"product:{db_review.product_id}")
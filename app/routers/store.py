@@ -1,12 +1,20 @@
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.cache import catalog_cache, make_cache_key
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.db.loading import LEAN
 from app.db.session import get_session
-from app.models.user import User
+from app.schemas.auth_schema import CurrentUser
 from app.models.vendor import Vendor, Store
 from app.schemas.vendor_schema import StoreCreate, StoreRead, StoreUpdate
+from app.services.ownership_service import invalidate_vendor_stores
+from app.services.stores_service import with_store_stats
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/stores", tags=["Stores"])
@@ -27,7 +35,7 @@ async def get_vendor_from_user(user_id: int, session: AsyncSession) -> Vendor:
 async def create_store(
     store_data: StoreCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     vendor = await get_vendor_from_user(current_user.id, session)
 
@@ -40,7 +48,10 @@ async def create_store(
     session.add(db_store)
     await session.commit()
     await session.refresh(db_store)
-    return db_store
+    await invalidate_vendor_stores(current_user.id)
+    await catalog_cache.invalidate("stores")
+    (store,) = await with_store_stats(session, [db_store])
+    return store
 
 
 @router.get("/", response_model=List[StoreRead])
@@ -52,33 +63,51 @@ async def list_stores(
     """
     Public endpoint to list all stores.
     """
-    query = select(Store).offset(skip).limit(limit)
+    cache_key = make_cache_key("stores:list", {"skip": skip, "limit": limit})
+    cached = await catalog_cache.get(cache_key)
+    if cached is not None:
+        return JSONResponse(cached)
+
+    query = select(Store).options(*LEAN).order_by(Store.id).offset(skip).limit(limit)
     results = await session.execute(query)
-    return results.scalars().all()
+    stores = await with_store_stats(session, results.scalars().all())
+    # Product counts and ratings follow product and review writes
+    await catalog_cache.set(
+        cache_key, jsonable_encoder(stores), tags=["stores", "products"]
+    )
+    return stores
 
 
 @router.get("/me", response_model=List[StoreRead])
 async def get_my_stores(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     vendor = await get_vendor_from_user(current_user.id, session)
 
     stores_result = await session.execute(
-        select(Store).where(Store.vendor_id == vendor.id)
+        select(Store).options(*LEAN).where(Store.vendor_id == vendor.id)
     )
-    return stores_result.scalars().all()
+    return await with_store_stats(session, stores_result.scalars().all())
 
 
 @router.get("/{store_id}", response_model=StoreRead)
 async def get_store(
     store_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
 ):
     # Public endpoint to view a store
-    store = await session.get(Store, store_id)
-    if not store:
+    db_store = await session.get(Store, store_id, options=LEAN)
+    if not db_store:
         raise HTTPException(status_code=404, detail="Store not found.")
+
+    (store,) = await with_store_stats(session, [db_store])
+    etag = make_etag(store.updated_at, store.model_dump())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return store
 
 
@@ -87,7 +116,7 @@ async def update_store(
     store_id: int,
     store_data: StoreUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     vendor = await get_vendor_from_user(current_user.id, session)
 
@@ -103,8 +132,12 @@ async def update_store(
     update_data = store_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_store, key, value)
+    db_store.updated_at = datetime.now()
 
     session.add(db_store)
     await session.commit()
     await session.refresh(db_store)
-    return db_store
+    # Store name/verification show up in product host info
+    await catalog_cache.invalidate("stores", "products", f"store:{store_id}")
+    (store,) = await with_store_stats(session, [db_store])
+    return store
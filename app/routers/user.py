@@ -7,16 +7,18 @@ from uuid import uuid4
 from sqlmodel import select
 
 
+from app.core.cache import catalog_cache
 from app.models.user import User
+from app.models.vendor import Store, Vendor
 from app.db.session import get_session
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_db_user
 from app.core.config import settings
 from app.schemas.user_schema import (
     GetUsernamesRequest,
     GetUsernamesResponse,
     UsernamesUser,
 )
-from app.services.users_service import get_all_usernames
+from app.services.users_service import get_all_usernames, invalidate_current_user
 from app.core.jwt import decode_access_token
 
 router = APIRouter(tags=["user"])
@@ -26,7 +28,7 @@ router = APIRouter(tags=["user"])
 async def update_user(
     data: dict,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
 ):
     """
     Expects JSON:
@@ -49,6 +51,18 @@ async def update_user(
     session.add(current_user)
     await session.commit()
     await session.refresh(current_user)
+    await invalidate_current_user(current_user.id)
+
+    if current_user.is_vendor:
+        # Vendor username/profile_pic are part of cached product host info
+        store_ids = await session.execute(
+            select(Store.id)
+            .join(Vendor, Vendor.id == Store.vendor_id)
+            .where(Vendor.user_id == current_user.id)
+        )
+        await catalog_cache.invalidate(
+            "products", *(f"store:{store_id}" for store_id in store_ids.scalars())
+        )
 
     return {
         "status": "success",
@@ -1,13 +1,27 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.cache import catalog_cache, make_cache_key
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.db.loading import LEAN
 from app.db.session import get_session
 from app.models.user import User
 from app.models.vendor import Vendor
+from app.schemas.auth_schema import CurrentUser
+from app.schemas.order_schema import VendorOrderPage
 from app.schemas.vendor_schema import VendorCreate, VendorRead, VendorUpdate
-from app.routers.auth import get_current_user
+from app.services import orders_service
+from app.services.ownership_service import (
+    get_vendor_store_ids,
+    invalidate_vendor_stores,
+)
+from app.services.users_service import invalidate_current_user
+from app.routers.auth import get_current_db_user, get_current_user
 
 router = APIRouter(prefix="/vendors", tags=["Vendors"])
 
@@ -16,7 +30,7 @@ router = APIRouter(prefix="/vendors", tags=["Vendors"])
 async def create_vendor_profile(
     vendor_data: VendorCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
 ):
     # Check if user is already a vendor
     vendor_result = await session.execute(
@@ -41,6 +55,9 @@ async def create_vendor_profile(
     session.add(db_vendor)
     await session.commit()
     await session.refresh(db_vendor)
+    await invalidate_current_user(current_user.id)
+    await invalidate_vendor_stores(current_user.id)
+    await catalog_cache.invalidate("vendors")
     return db_vendor
 
 
@@ -53,21 +70,31 @@ async def list_vendors(
     """
     Public endpoint to list all vendors.
     """
-    query = select(Vendor).offset(skip).limit(limit)
+    cache_key = make_cache_key("vendors:list", {"skip": skip, "limit": limit})
+    cached = await catalog_cache.get(cache_key)
+    if cached is not None:
+        return JSONResponse(cached)
+
+    query = select(Vendor).options(*LEAN).order_by(Vendor.id).offset(skip).limit(limit)
     results = await session.execute(query)
-    return results.scalars().all()
+    vendors = [
+        VendorRead.model_validate(vendor, from_attributes=True)
+        for vendor in results.scalars().all()
+    ]
+    await catalog_cache.set(cache_key, jsonable_encoder(vendors), tags=["vendors"])
+    return vendors
 
 
 @router.get("/me", response_model=VendorRead)
 async def get_my_vendor_profile(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     if not current_user.is_vendor:
         raise HTTPException(status_code=403, detail="User is not a vendor.")
 
     vendor_result = await session.execute(
-        select(Vendor).where(Vendor.user_id == current_user.id)
+        select(Vendor).options(*LEAN).where(Vendor.user_id == current_user.id)
     )
     vendor = vendor_result.scalars().first()
     if not vendor:
@@ -75,17 +102,77 @@ async def get_my_vendor_profile(
     return vendor
 
 
+async def my_store_ids(
+    session: AsyncSession, current_user: CurrentUser, store_id: Optional[int]
+) -> List[int]:
+    """
+    The caller's store ids, or just `store_id` when given and theirs.
+    """
+    if not current_user.is_vendor:
+        raise HTTPException(status_code=403, detail="User is not a vendor.")
+    store_ids = await get_vendor_store_ids(session, current_user.id)
+    if store_id is None:
+        return store_ids
+    if store_id not in store_ids:
+        raise HTTPException(status_code=404, detail="Store not found.")
+    return [store_id]
+
+
+@router.get("/me/orders", response_model=VendorOrderPage)
+async def list_my_store_orders(
+    status: Optional[List[str]] = Query(None),
+    store_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Orders placed against the caller's stores, newest first. Filter with
+    repeated ?status=paid&status=processing and/or one store_id; pass
+    next_cursor back as ?cursor= for the next page.
+    """
+    store_ids = await my_store_ids(session, current_user, store_id)
+    return await orders_service.store_order_inbox(
+        session,
+        store_ids,
+        orders_service.order_statuses(status),
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+@router.get("/me/orders/counts", response_model=Dict[str, int])
+async def count_my_store_orders(
+    store_id: Optional[int] = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Number of orders per status over the caller's stores (or one store_id).
+    """
+    store_ids = await my_store_ids(session, current_user, store_id)
+    return await orders_service.store_order_counts(session, store_ids)
+
+
 @router.get("/{vendor_id}", response_model=VendorRead)
 async def get_vendor(
     vendor_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
 ):
     """
     Public endpoint to get a single vendor by ID.
     """
-    vendor = await session.get(Vendor, vendor_id)
+    vendor = await session.get(Vendor, vendor_id, options=LEAN)
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
+
+    etag = make_etag(vendor.updated_at, vendor.model_dump())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return vendor
 
 
@@ -93,7 +180,7 @@ async def get_vendor(
 async def update_my_vendor_profile(
     vendor_data: VendorUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     if not current_user.is_vendor:
         raise HTTPException(status_code=403, detail="User is not a vendor.")
@@ -108,8 +195,10 @@ async def update_my_vendor_profile(
     update_data = vendor_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_vendor, key, value)
+    db_vendor.updated_at = datetime.now()
 
     session.add(db_vendor)
     await session.commit()
     await session.refresh(db_vendor)
+    await catalog_cache.invalidate("vendors")
     return db_vendor
@@ -44,6 +44,22 @@ class UserRead(UserBase):
     model_config = {"from_attributes": True}
 
 
+class CurrentUser(BaseModel):
+    """
+    Identity of the authenticated caller, as cached by get_current_user.
+    Handlers that need to modify the user depend on get_current_db_user.
+    """
+
+    id: int
+    username: Optional[str] = None
+    profile_pic: Optional[str] = None
+    is_active: bool
+    is_admin: bool
+    is_vendor: bool
+
+    model_config = {"from_attributes": True}
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class CartItemAdd(BaseModel):
+    product_id: int
+    quantity: int = Field(default=1, ge=1)
+
+
+class CartItemUpdate(BaseModel):
+    # 0 removes the line
+    quantity: int = Field(ge=0)
+
+
+class CartMergeRequest(BaseModel):
+    # Guest cart kept by the client before login
+    items: List[CartItemAdd]
+
+
+class CartLine(BaseModel):
+    product_id: int
+    name: str
+    price: float
+    quantity: int
+    line_total: float
+    store_id: int
+
+
+class CartStoreGroup(BaseModel):
+    store_id: int
+    store_name: Optional[str] = None
+    subtotal: float
+    item_count: int
+    product_ids: List[int]
+
+
+class CartSummary(BaseModel):
+    items: List[CartLine] = []
+    stores: List[CartStoreGroup] = []
+    subtotal: float = 0.0
+    item_count: int = 0
+    # Products dropped from the cart because they are gone or inactive
+    unavailable: List[int] = []
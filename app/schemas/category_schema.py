@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -25,3 +25,14 @@ class CategoryRead(CategoryBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    # Only filled in when the endpoint is called with ?with_counts=true
+    product_count: Optional[int] = None
+    active_product_count: Optional[int] = None
+
+
+class CategoryTreeNode(BaseModel):
+    id: int
+    name: str
+    slug: str
+    parent_id: Optional[int] = None
+    children: List["CategoryTreeNode"] = []
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 
 
@@ -25,6 +25,52 @@ class Order(BaseModel):
     products: List[OrderProduct]
 
 
+class OrderFilter(BaseModel):
+    # Order statuses to include, e.g. ["paid", "shipped"]; all when omitted
+    status: Optional[List[str]] = None
+    # "offset" returns the whole history as a list; "cursor" returns an
+    # OrderPage, pass its next_cursor back to get the next (older) page
+    pagination: Literal["offset", "cursor"] = "offset"
+    cursor: Optional[str] = None
+    limit: int = Field(default=20, ge=1, le=100)
+
+
+class OrderPage(BaseModel):
+    items: List[Order]
+    next_cursor: Optional[str] = None
+
+
+class VendorOrder(BaseModel):
+    id: int
+    store_id: int
+    status: str
+    grand_total: float
+    item_count: int
+    buyer: str
+    created_at: datetime
+
+
+class VendorOrderPage(BaseModel):
+    items: List[VendorOrder]
+    next_cursor: Optional[str] = None
+
+
+class OrderStatusUpdate(BaseModel):
+    status: str
+    note: Optional[str] = None
+
+
+class OrderEventRead(BaseModel):
+    from_status: Optional[str] = None
+    to_status: str
+    actor_id: Optional[int] = None
+    note: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class CheckoutItem(BaseModel):
     # Assuming cart item structure based on docs
     product_id: str
@@ -38,7 +84,13 @@ class CheckoutDataRequest(BaseModel):
 
 class CheckoutDataResponse(BaseModel):
     total: float
+    # Delivery distance in km from the buyer's address to each store in
+    # `stores` (stores with known coordinates); empty for anonymous callers
+    # or addresses without coordinates
     distances: List[float]
+    stores: List[int] = []
+    shipping: float = 0.0
+    grand_total: Optional[float] = None
 
 
 class CheckoutConfirmRequest(BaseModel):
@@ -63,3 +115,4 @@ class PlaceOrderRequest(BaseModel):
 class StatusResponse(BaseModel):
     status: str
     message: Optional[str] = None
+    orders: Optional[List[int]] = None
@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from enum import Enum
+from pydantic import BaseModel, Field, field_validator
 
 from app.schemas.vendor_schema import VendorInfo
 
@@ -54,16 +55,62 @@ class ProductDisplay(BaseModel):
     average_rating: float = 0.0
 
 
+class ProductSort(str, Enum):
+    newest = "newest"
+    price_asc = "price_asc"
+    price_desc = "price_desc"
+    rating = "rating"
+
+
 class ProductFilter(BaseModel):
     store_id: Optional[int] = None
     category_id: Optional[int] = None
+    # Also match products in sub-categories of category_id
+    include_descendants: bool = False
     min_price: Optional[float] = None
     max_price: Optional[float] = None
     search: Optional[str] = None
+    sort: Optional[ProductSort] = None
+    # "cursor" returns a ProductPage; pass its next_cursor back to get the next page
+    pagination: Literal["offset", "cursor"] = "offset"
+    cursor: Optional[str] = None
     skip: int = 0
     limit: int = 20
 
 
+class ProductPage(BaseModel):
+    items: List[ProductDisplay]
+    next_cursor: Optional[str] = None
+
+
+class FacetCount(BaseModel):
+    id: int
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    min_price: Optional[float]
+    max_price: Optional[float]
+    count: int
+
+
+class ProductFacets(BaseModel):
+    total: int
+    categories: List[FacetCount] = []
+    stores: List[FacetCount] = []
+    price_buckets: List[PriceBucketCount] = []
+
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=100)
+
+
+class ProductBatchResponse(BaseModel):
+    items: List[ProductDisplay]
+    # Requested ids that don't exist or are no longer active
+    missing: List[int] = []
+
+
 # Schemas for Review
 class ReviewBase(BaseModel):
     rating: int
@@ -75,8 +122,16 @@ class ReviewCreate(ReviewBase):
 
 
 class ReviewUpdate(ReviewBase):
+    # May be left out to keep the current rating, but not cleared
     rating: Optional[int] = None
 
+    @field_validator("rating")
+    @classmethod
+    def rating_not_null(cls, v: Optional[int]) -> int:
+        if v is None:
+            raise ValueError("rating cannot be null")
+        return v
+
 
 class ReviewRead(ReviewBase):
     id: int
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -40,6 +40,8 @@ class StoreBase(BaseModel):
     slug: str
     description: Optional[str] = None
     logo_url: Optional[str] = None
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
 
 
 class StoreCreate(StoreBase):
@@ -55,7 +57,10 @@ class StoreRead(StoreBase):
     id: int
     vendor_id: int
     is_verified: bool
+    # Live average over the reviews of the store's active products
     rating: Optional[float]
+    rating_count: int = 0
+    product_count: int = 0
     created_at: datetime
     updated_at: datetime
 
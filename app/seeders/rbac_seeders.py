@@ -52,6 +52,7 @@ PERMISSIONS = [
     {"name": "Update Orders", "code": "order:update"},
     {"name": "Delete Orders", "code": "order:delete"},
     {"name": "Manage Vendors", "code": "vendor:manage"},
+    {"name": "Manage Categories", "code": "category:manage"},
     {"name": "Add Review", "code": "review:create"},
     {"name": "Moderate Review", "code": "review:moderate"},
 ]
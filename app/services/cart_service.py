@@ -0,0 +1,245 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.models.product import Product
+from app.models.vendor import Store
+from app.models.wishlist_and_cart import CartItem
+from app.schemas.cart_schema import CartItemAdd, CartLine, CartStoreGroup, CartSummary
+from app.schemas.order_schema import CheckoutItem
+
+
+def _summary_key(user_id: int) -> str:
+    return f"cart:{user_id}"
+
+
+def summarize(
+    lines: Iterable[CartLine],
+    store_names: Dict[int, Optional[str]],
+    unavailable: Iterable[int] = (),
+) -> CartSummary:
+    """
+    Totals and per-store grouping for a set of priced cart lines.
+    """
+    lines = list(lines)
+    by_store: Dict[int, List[CartLine]] = defaultdict(list)
+    for line in lines:
+        by_store[line.store_id].append(line)
+    stores = [
+        CartStoreGroup(
+            store_id=store_id,
+            store_name=store_names.get(store_id),
+            subtotal=round(sum(line.line_total for line in group), 2),
+            item_count=sum(line.quantity for line in group),
+            product_ids=[line.product_id for line in group],
+        )
+        for store_id, group in sorted(by_store.items())
+    ]
+    return CartSummary(
+        items=lines,
+        stores=stores,
+        subtotal=round(sum(line.line_total for line in lines), 2),
+        item_count=sum(line.quantity for line in lines),
+        unavailable=sorted(unavailable),
+    )
+
+
+def cart_line(row: Row, quantity: int) -> CartLine:
+    return CartLine(
+        product_id=row.id,
+        name=row.name,
+        price=row.price,
+        quantity=quantity,
+        line_total=round(row.price * quantity, 2),
+        store_id=row.store_id,
+    )
+
+
+async def _save_summary(user_id: int, summary: CartSummary) -> None:
+    # Tagged with every product in it, so a price change or deactivation
+    # (which invalidates product:{id}) drops the summary
+    tags = [_summary_key(user_id)]
+    tags += [f"product:{line.product_id}" for line in summary.items]
+    tags += [f"product:{product_id}" for product_id in summary.unavailable]
+    await catalog_cache.set(
+        _summary_key(user_id),
+        summary.model_dump(),
+        tags=tags,
+        ttl=settings.CART_SUMMARY_TTL_SECONDS,
+    )
+
+
+async def get_cart_summary(session: AsyncSession, user_id: int) -> CartSummary:
+    """
+    The user's cart priced at current prices, from the cache when possible,
+    else with one query over cart, product and store.
+    """
+    cached = await catalog_cache.get(_summary_key(user_id))
+    if cached is not None:
+        return CartSummary.model_validate(cached)
+
+    result = await session.execute(
+        select(
+            CartItem.quantity,
+            Product.id,
+            Product.name,
+            Product.price,
+            Product.is_active,
+            Product.store_id,
+            Store.store_name,
+        )
+        .join(Product, Product.id == CartItem.product_id)
+        .outerjoin(Store, Store.id == Product.store_id)
+        .where(CartItem.user_id == user_id)
+        .order_by(CartItem.added_at, CartItem.id)
+    )
+    lines, store_names, unavailable = [], {}, []
+    for row in result.all():
+        if not row.is_active:
+            unavailable.append(row.id)
+            continue
+        lines.append(cart_line(row, row.quantity))
+        store_names[row.store_id] = row.store_name
+    summary = summarize(lines, store_names, unavailable)
+    await _save_summary(user_id, summary)
+    return summary
+
+
+async def invalidate_cart_summary(user_id: int) -> None:
+    """
+    Drops the cached summary after a committed cart change; the next read
+    rebuilds it. Patching the cached copy instead could let two concurrent
+    changes land in the cache in the opposite order to their commits.
+    """
+    await catalog_cache.invalidate(_summary_key(user_id))
+
+
+async def check_cart_product(session: AsyncSession, product_id: int) -> None:
+    """
+    404 unless the product exists and is active.
+    """
+    found = await session.scalar(
+        select(Product.id).where(Product.id == product_id, Product.is_active)
+    )
+    if found is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+
+async def add_item(
+    session: AsyncSession, user_id: int, product_id: int, quantity: int
+) -> None:
+    """
+    Adds `quantity` to the product's line, creating it if needed, with one
+    upsert on (user_id, product_id).
+    """
+    stmt = pg_insert(CartItem).values(
+        user_id=user_id,
+        product_id=product_id,
+        quantity=quantity,
+        added_at=datetime.now(),
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            constraint="uq_cartitem_user_product",
+            set_={"quantity": CartItem.quantity + stmt.excluded.quantity},
+        )
+    )
+
+
+async def set_quantity(
+    session: AsyncSession, user_id: int, product_id: int, quantity: int
+) -> None:
+    """
+    Sets a line's quantity; 0 removes it. 404 when the line doesn't exist.
+    """
+    where = (CartItem.user_id == user_id, CartItem.product_id == product_id)
+    if quantity > 0:
+        stmt = update(CartItem).where(*where).values(quantity=quantity)
+    else:
+        stmt = delete(CartItem).where(*where)
+    result = await session.execute(stmt.returning(CartItem.id))
+    if result.first() is None:
+        raise HTTPException(status_code=404, detail="Product not in cart")
+
+
+async def merge_items(
+    session: AsyncSession, user_id: int, items: Iterable[CartItemAdd]
+) -> List[int]:
+    """
+    Folds a guest cart into the user's cart with one upsert. A product in
+    both keeps the larger quantity, so merging the same guest cart twice (or
+    one built from this cart) doesn't double it. Unknown and inactive
+    products are skipped; their ids are returned.
+    """
+    quantities: Dict[int, int] = defaultdict(int)
+    for item in items:
+        quantities[item.product_id] += item.quantity
+    if not quantities:
+        return []
+
+    result = await session.execute(
+        select(Product.id).where(Product.id.in_(quantities), Product.is_active)
+    )
+    available = set(result.scalars().all())
+    skipped = sorted(set(quantities) - available)
+    if available:
+        now = datetime.now()
+        stmt = pg_insert(CartItem).values(
+            [
+                {
+                    "user_id": user_id,
+                    "product_id": product_id,
+                    "quantity": quantities[product_id],
+                    "added_at": now,
+                }
+                for product_id in sorted(available)
+            ]
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_cartitem_user_product",
+                set_={
+                    "quantity": func.greatest(CartItem.quantity, stmt.excluded.quantity)
+                },
+            )
+        )
+    return skipped
+
+
+async def clear_items(
+    session: AsyncSession, user_id: int, product_ids: Optional[Iterable[int]] = None
+) -> None:
+    """
+    Empties the cart, or just the lines for `product_ids`.
+    """
+    stmt = delete(CartItem).where(CartItem.user_id == user_id)
+    if product_ids is not None:
+        stmt = stmt.where(CartItem.product_id.in_(list(product_ids)))
+    await session.execute(stmt)
+
+
+async def cart_checkout_items(
+    session: AsyncSession, user_id: int
+) -> List[CheckoutItem]:
+    """
+    The stored cart in the shape the checkout endpoints take, for clients
+    that no longer send the cart themselves.
+    """
+    result = await session.execute(
+        select(CartItem.product_id, CartItem.quantity)
+        .where(CartItem.user_id == user_id)
+        .order_by(CartItem.product_id)
+    )
+    return [
+        CheckoutItem(product_id=str(product_id), quantity=quantity)
+        for product_id, quantity in result.all()
+    ]
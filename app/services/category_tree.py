@@ -0,0 +1,161 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.product import Category
+from app.schemas.category_schema import CategoryTreeNode
+
+
+def child_path(parent_path: Optional[str], category_id: int) -> str:
+    return f"{parent_path or '/'}{category_id}/"
+
+
+async def _parent_path(session: AsyncSession, parent_id: Optional[int]) -> str:
+    if parent_id is None:
+        return "/"
+    parent_path = await session.scalar(
+        select(Category.path).where(Category.id == parent_id)
+    )
+    if parent_path is None:
+        raise HTTPException(
+            status_code=400, detail=f"Parent category with id {parent_id} not found"
+        )
+    return parent_path
+
+
+async def assign_path(session: AsyncSession, category: Category) -> None:
+    """
+    Flushes a new category and sets its path under its parent's.
+    """
+    parent_path = await _parent_path(session, category.parent_id)
+    await session.flush()
+    category.path = child_path(parent_path, category.id)
+
+
+async def move_subtree(
+    session: AsyncSession, category: Category, new_parent_id: Optional[int]
+) -> None:
+    """
+    Re-parents a category, rewriting the path of its whole subtree in one UPDATE.
+    """
+    old_prefix = category.path or child_path(None, category.id)
+    parent_path = await _parent_path(session, new_parent_id)
+    if parent_path.startswith(old_prefix):
+        raise HTTPException(
+            status_code=400, detail="A category cannot be moved under itself"
+        )
+    new_prefix = child_path(parent_path, category.id)
+
+    await session.execute(
+        update(Category)
+        .where(Category.path.like(f"{old_prefix}%"))
+        .values(path=new_prefix + func.substr(Category.path, len(old_prefix) + 1))
+        .execution_options(synchronize_session=False)
+    )
+    category.parent_id = new_parent_id
+    category.path = new_prefix
+
+
+async def detach_subtree(session: AsyncSession, category: Category) -> None:
+    """
+    Before deleting a category, hands its children (and their subtrees) to its parent.
+    """
+    old_prefix = category.path or child_path(None, category.id)
+    parent_prefix = old_prefix[: -len(f"{category.id}/")]
+
+    await session.execute(
+        update(Category)
+        .where(Category.parent_id == category.id)
+        .values(parent_id=category.parent_id)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(
+        update(Category)
+        .where(
+            Category.path.like(f"{old_prefix}%"),
+            Category.id != category.id,
+        )
+        .values(path=parent_prefix + func.substr(Category.path, len(old_prefix) + 1))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def subtree_ids_query(session: AsyncSession, category_id: int) -> Select:
+    """
+    Ids of the category and all of its descendants, matched on the
+    materialized path in the database, so moves made by other workers are
+    seen at once. Meant for use as an IN (...) subquery.
+
+    The path is looked up first so the LIKE gets a literal prefix, which
+    ix_category_path (text_pattern_ops) can serve as a range scan.
+    """
+    path = await session.scalar(select(Category.path).where(Category.id == category_id))
+    prefix = path or child_path(None, category_id)
+    return select(Category.id).where(Category.path.like(f"{prefix}%"))
+
+
+class CategoryTreeSnapshot:
+    """
+    In-memory copy of the category tree. Rebuilt on the next read after a
+    local change, or after CATEGORY_TREE_TTL_SECONDS to pick up other workers'.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._lock = asyncio.Lock()
+        self._built_at: Optional[float] = None
+        self._roots: List[CategoryTreeNode] = []
+
+    def invalidate(self) -> None:
+        self._built_at = None
+
+    async def roots(self, session: AsyncSession) -> List[CategoryTreeNode]:
+        await self._ensure_fresh(session)
+        return self._roots
+
+    async def _ensure_fresh(self, session: AsyncSession) -> None:
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if not self._is_fresh():
+                await self._rebuild(session)
+
+    def _is_fresh(self) -> bool:
+        return self._built_at is not None and (
+            time.monotonic() - self._built_at < self.ttl
+        )
+
+    async def _rebuild(self, session: AsyncSession) -> None:
+        result = await session.execute(
+            select(
+                Category.id, Category.name, Category.slug, Category.parent_id
+            ).order_by(Category.name)
+        )
+        nodes: Dict[int, CategoryTreeNode] = {}
+        parents: Dict[int, Optional[int]] = {}
+        for category_id, name, slug, parent_id in result.all():
+            nodes[category_id] = CategoryTreeNode(
+                id=category_id, name=name, slug=slug, parent_id=parent_id
+            )
+            parents[category_id] = parent_id
+
+        roots = []
+        for category_id, node in nodes.items():
+            parent = nodes.get(parents[category_id])
+            if parent is None:
+                roots.append(node)
+            else:
+                parent.children.append(node)
+
+        self._roots = roots
+        self._built_at = time.monotonic()
+
+
+category_tree = CategoryTreeSnapshot(ttl=settings.CATEGORY_TREE_TTL_SECONDS)
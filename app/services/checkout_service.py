@@ -0,0 +1,254 @@
+import hashlib
+import hmac
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.order import CheckoutSession, CheckoutStatus
+from app.models.product import Product
+from app.models.user import Address
+from app.models.vendor import Store
+from app.schemas.order_schema import CheckoutDataResponse, CheckoutItem
+from app.services import orders_service
+from app.services.inventory_service import reserve_stock
+from app.utils.geo import Point, distances_km
+
+
+def cart_hash(quantities: Dict[int, int]) -> str:
+    """
+    Stable fingerprint of a cart, independent of line order and repeats.
+    """
+    raw = json.dumps(sorted(quantities.items()), separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def buyer_location(
+    session: AsyncSession, user_id: int, location_index: Optional[float] = None
+) -> Optional[Point]:
+    """
+    Coordinates of the buyer's address at `location_index` (in the order
+    get_user_locations lists them), or of the default address when no index
+    is given. None when there is no such address or it has no coordinates.
+    """
+    result = await session.execute(
+        select(Address.latitude, Address.longitude, Address.is_default)
+        .where(Address.user_id == user_id)
+        .order_by(Address.id)
+    )
+    addresses = result.all()
+    if location_index is not None:
+        index = int(location_index)
+        address = addresses[index] if 0 <= index < len(addresses) else None
+    else:
+        address = next((a for a in addresses if a.is_default), None)
+    if address is None or address.latitude is None or address.longitude is None:
+        return None
+    return address.latitude, address.longitude
+
+
+def shipping_cost(distance_km: Optional[float]) -> float:
+    """
+    Tariff for shipping one store's part of an order; the base fee alone
+    when the distance is unknown.
+    """
+    cost = settings.SHIPPING_BASE_FEE
+    if distance_km is not None:
+        cost += settings.SHIPPING_RATE_PER_KM * distance_km
+    return round(cost, 2)
+
+
+async def quote_checkout(
+    session: AsyncSession,
+    cart: Iterable[CheckoutItem],
+    user_id: Optional[int] = None,
+    location_index: Optional[float] = None,
+) -> CheckoutDataResponse:
+    """
+    Cart total plus delivery distance and shipping per store. Products and
+    their stores' coordinates come from one joined query; the distances to
+    all stores are computed in one batch.
+    """
+    quantities = orders_service.cart_quantities(cart)
+    if not quantities:
+        return CheckoutDataResponse(total=0.0, distances=[])
+
+    result = await session.execute(
+        select(Product.id, Product.price, Store.id, Store.latitude, Store.longitude)
+        .join(Store, Store.id == Product.store_id)
+        .where(Product.id.in_(quantities))
+    )
+    rows = result.all()
+    missing = sorted(set(quantities) - {row[0] for row in rows})
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Some products were not found", "missing": missing},
+        )
+
+    total = 0.0
+    stores: Dict[int, Optional[Point]] = {}
+    for product_id, price, store_id, latitude, longitude in rows:
+        total += price * quantities[product_id]
+        has_coords = latitude is not None and longitude is not None
+        stores[store_id] = (latitude, longitude) if has_coords else None
+    store_ids = sorted(stores)
+
+    origin = await buyer_location(session, user_id, location_index) if user_id else None
+    located = [sid for sid in store_ids if stores[sid] is not None] if origin else []
+    by_store: Dict[int, float] = {}
+    if located:
+        points = [stores[sid] for sid in located]
+        by_store = dict(zip(located, distances_km(origin, points)))
+    shipping = sum(shipping_cost(by_store.get(sid)) for sid in store_ids)
+
+    return CheckoutDataResponse(
+        total=total,
+        distances=[round(by_store[sid], 2) for sid in located],
+        stores=located,
+        shipping=round(shipping, 2),
+        grand_total=round(total + shipping, 2),
+    )
+
+
+async def drop_open_checkouts(session: AsyncSession, user_id: int) -> List[str]:
+    """
+    Deletes the user's open checkouts and returns their order_refs, whose
+    stock holds the caller takes over or releases. A place_order already
+    completing one of them holds its row lock, so that checkout finishes
+    first and is kept.
+    """
+    result = await session.execute(
+        delete(CheckoutSession)
+        .where(
+            CheckoutSession.user_id == user_id,
+            CheckoutSession.status == CheckoutStatus.open,
+        )
+        .returning(CheckoutSession.order_ref)
+    )
+    return list(result.scalars().all())
+
+
+async def open_checkout(
+    session: AsyncSession, user_id: int, cart: Iterable[CheckoutItem]
+) -> CheckoutSession:
+    """
+    Locks the cart's current prices and reserves its stock under a new
+    order_ref. A user has at most one open checkout: confirming again
+    replaces the earlier one and its stock hold, so repeated confirms can't
+    pile up holds on a product's stock. Nothing is committed.
+    """
+    quantities = orders_service.cart_quantities(cart)
+    if not quantities:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+
+    result = await session.execute(
+        select(Product.id, Product.price).where(
+            Product.id.in_(quantities), Product.is_active
+        )
+    )
+    prices = dict(result.all())
+    unavailable = sorted(pid for pid in quantities if pid not in prices)
+    if unavailable:
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Some products are unavailable", "missing": unavailable},
+        )
+
+    replaced = await drop_open_checkouts(session, user_id)
+    ttl = settings.STOCK_RESERVATION_TTL_SECONDS
+    checkout = CheckoutSession(
+        order_ref=str(uuid.uuid4()),
+        user_id=user_id,
+        token=str(uuid.uuid4()),
+        cart_hash=cart_hash(quantities),
+        prices={str(pid): price for pid, price in prices.items()},
+        expires_at=datetime.now() + timedelta(seconds=ttl),
+    )
+    session.add(checkout)
+    await reserve_stock(
+        session, checkout.order_ref, user_id, quantities, ttl=ttl, replaces=replaced
+    )
+    return checkout
+
+
+async def complete_checkout(
+    session: AsyncSession,
+    user_id: int,
+    order_ref: str,
+    token: str,
+    cart: Iterable[CheckoutItem],
+    shipping_address_id: Optional[int] = None,
+) -> Tuple[List[int], bool]:
+    """
+    Places the orders of a confirmed checkout exactly once. The session row
+    is locked (primary-key lookup, FOR UPDATE), so concurrent retries queue
+    up behind the first one and then replay its result.
+    Returns (order ids, replayed). Nothing is committed.
+    """
+    result = await session.execute(
+        select(CheckoutSession)
+        .where(CheckoutSession.order_ref == order_ref)
+        .with_for_update()
+    )
+    checkout = result.scalars().first()
+    if (
+        checkout is None
+        or checkout.user_id != user_id
+        or not hmac.compare_digest(checkout.token, token)
+    ):
+        raise HTTPException(status_code=404, detail="Checkout not found")
+
+    if checkout.status == CheckoutStatus.completed:
+        return checkout.order_ids or [], True
+    if checkout.expires_at < datetime.now():
+        raise HTTPException(status_code=410, detail="Checkout expired, confirm again")
+
+    quantities = orders_service.cart_quantities(cart)
+    if not quantities:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+    if cart_hash(quantities) != checkout.cart_hash:
+        raise HTTPException(
+            status_code=409, detail="Cart changed since checkout, confirm again"
+        )
+
+    order_ids = await orders_service.place_order(
+        session,
+        user_id,
+        cart,
+        shipping_address_id=shipping_address_id,
+        order_ref=order_ref,
+        prices={int(pid): price for pid, price in checkout.prices.items()},
+    )
+    checkout.status = CheckoutStatus.completed
+    checkout.order_ids = order_ids
+    checkout.completed_at = datetime.now()
+    session.add(checkout)
+    return order_ids, False
+
+
+async def delete_stale_checkouts(session: AsyncSession) -> int:
+    """
+    Deletes expired open checkouts, and completed ones once the replay
+    window has passed (counted from expiry, which is never before
+    completion, so both cases ride on the expires_at index). Their stock
+    holds are released separately by the reservation sweeper.
+    """
+    now = datetime.now()
+    retention = timedelta(seconds=settings.CHECKOUT_SESSION_RETENTION_SECONDS)
+    result = await session.execute(
+        delete(CheckoutSession).where(
+            CheckoutSession.expires_at < now,
+            or_(
+                CheckoutSession.status == CheckoutStatus.open,
+                CheckoutSession.expires_at < now - retention,
+            ),
+        )
+    )
+    return result.rowcount
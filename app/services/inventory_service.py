@@ -0,0 +1,198 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.models.inventory import StockReservation
+from app.models.product import Product
+
+# session.info key collecting the products whose stock the transaction moved
+STOCK_MOVED = "stock_moved"
+
+
+def _stock_moved(session: AsyncSession, product_ids: Iterable[int]) -> None:
+    session.info.setdefault(STOCK_MOVED, set()).update(product_ids)
+
+
+async def invalidate_moved_stock(session: AsyncSession) -> None:
+    """
+    Drops the cached catalog entries of every product whose stock moved in
+    this session. Call after the commit, like the other cache invalidations.
+    """
+    moved = session.info.pop(STOCK_MOVED, set())
+    if moved:
+        await catalog_cache.invalidate(
+            "products", *(f"product:{product_id}" for product_id in sorted(moved))
+        )
+
+
+async def apply_stock_deltas(session: AsyncSession, deltas: Dict[int, int]) -> None:
+    """
+    Applies signed per-product changes to Product.stock, all or nothing:
+    positive deltas put stock back, negative ones take it.
+
+    Takes are conditional (UPDATE ... WHERE stock >= q), so two checkouts can
+    never sell the same unit. Returns and takes go through one loop in
+    product id order, so every transaction locks product rows in the same
+    order, whatever mix of returns and takes it does, and concurrent ones
+    cannot deadlock. When any product is short, raises 409 listing all of
+    them; the caller must roll back, which undoes the changes made so far.
+    """
+    short = []
+    for product_id in sorted(deltas):
+        delta = deltas[product_id]
+        if delta == 0:
+            continue
+        stmt = update(Product).where(Product.id == product_id)
+        if delta < 0:
+            stmt = stmt.where(Product.stock >= -delta)
+        changed = await session.execute(
+            stmt.values(stock=Product.stock + delta, updated_at=datetime.now())
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+        if delta < 0 and changed.first() is None:
+            short.append(product_id)
+    if short:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Not enough stock", "products": short},
+        )
+    _stock_moved(session, (pid for pid, delta in deltas.items() if delta))
+
+
+async def take_stock(session: AsyncSession, quantities: Dict[int, int]) -> None:
+    """
+    Takes `quantities` off Product.stock, all or nothing (see apply_stock_deltas).
+    """
+    await apply_stock_deltas(
+        session, {product_id: -quantity for product_id, quantity in quantities.items()}
+    )
+
+
+async def return_stock(session: AsyncSession, quantities: Dict[int, int]) -> None:
+    """
+    Puts `quantities` back on Product.stock.
+    """
+    await apply_stock_deltas(session, quantities)
+
+
+def _net_deltas(held: Dict[int, int], wanted: Dict[int, int]) -> Dict[int, int]:
+    # Stock to give back (positive) or take (negative) to go from `held` to `wanted`
+    return {
+        product_id: held.get(product_id, 0) - wanted.get(product_id, 0)
+        for product_id in set(held) | set(wanted)
+    }
+
+
+async def reserve_stock(
+    session: AsyncSession,
+    order_ref: str,
+    user_id: int,
+    quantities: Dict[int, int],
+    ttl: int = settings.STOCK_RESERVATION_TTL_SECONDS,
+    replaces: Iterable[str] = (),
+) -> datetime:
+    """
+    Holds stock for a checkout until place_order or expiry. Replaces any
+    earlier reservation under the same order_ref or one of the `replaces`
+    refs; only the net difference is moved, in a single pass. Returns the
+    expiry time.
+    """
+    held = await _pop_reservations(session, user_id, [order_ref, *replaces])
+    await apply_stock_deltas(session, _net_deltas(held, quantities))
+    expires_at = datetime.now() + timedelta(seconds=ttl)
+    await session.execute(
+        insert(StockReservation),
+        [
+            {
+                "order_ref": order_ref,
+                "user_id": user_id,
+                "product_id": product_id,
+                "quantity": quantity,
+                "expires_at": expires_at,
+                "created_at": datetime.now(),
+            }
+            for product_id, quantity in sorted(quantities.items())
+        ],
+    )
+    return expires_at
+
+
+async def _pop_reservations(
+    session: AsyncSession, user_id: int, order_refs: Iterable[str]
+) -> Dict[int, int]:
+    result = await session.execute(
+        delete(StockReservation)
+        .where(
+            StockReservation.order_ref.in_(list(order_refs)),
+            StockReservation.user_id == user_id,
+        )
+        .returning(StockReservation.product_id, StockReservation.quantity)
+    )
+    held: Dict[int, int] = defaultdict(int)
+    for product_id, quantity in result.all():
+        held[product_id] += quantity
+    return dict(held)
+
+
+async def release_reservation(
+    session: AsyncSession, order_ref: str, user_id: int
+) -> None:
+    """
+    Drops a reservation and hands its stock back.
+    """
+    await return_stock(session, await _pop_reservations(session, user_id, [order_ref]))
+
+
+async def commit_stock(
+    session: AsyncSession,
+    order_ref: str,
+    user_id: int,
+    quantities: Dict[int, int],
+) -> None:
+    """
+    Final stock movement for an order. Stock already held under `order_ref`
+    is used as is; only the difference to `quantities` is taken or returned,
+    in a single pass. Without a (live) reservation this is a plain
+    take_stock. An expired reservation that the sweeper hasn't reached yet
+    is still honoured.
+    """
+    held = await _pop_reservations(session, user_id, [order_ref])
+    await apply_stock_deltas(session, _net_deltas(held, quantities))
+
+
+async def release_expired_reservations(
+    session: AsyncSession, batch_size: int = 500
+) -> int:
+    """
+    Returns the stock of up to `batch_size` expired reservations and deletes
+    them. SKIP LOCKED lets several workers sweep side by side, and keeps the
+    sweep out of the way of a place_order consuming the same reservation.
+    Returns the number of reservations released.
+    """
+    expired = (
+        select(StockReservation.id)
+        .where(StockReservation.expires_at < datetime.now())
+        .order_by(StockReservation.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        delete(StockReservation)
+        .where(StockReservation.id.in_(expired))
+        .returning(StockReservation.product_id, StockReservation.quantity)
+    )
+    released: Dict[int, int] = defaultdict(int)
+    rows = result.all()
+    for product_id, quantity in rows:
+        released[product_id] += quantity
+    await return_stock(session, released)
+    return len(rows)
@@ -7,9 +7,12 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 async def get_user_locations(user_id: int, session: AsyncSession) -> List[Address]:
     """
-    Retrieves all addresses for a given user.
+    Retrieves all addresses for a given user, oldest first. Clients pick an
+    address by its position in this list (checkout's location_index).
     """
-    result = await session.execute(select(Address).where(Address.user_id == user_id))
+    result = await session.execute(
+        select(Address).where(Address.user_id == user_id).order_by(Address.id)
+    )
     addresses = result.scalars().all()
     return addresses
 
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.order import (
+    Order,
+    OrderEvent,
+    OrderItem,
+    OrderStatus,
+    StoreOrderCounter,
+)
+from app.services import outbox_service
+from app.services.inventory_service import return_stock
+
+# Allowed status changes; delivered and cancelled are final
+TRANSITIONS: Dict[OrderStatus, frozenset] = {
+    OrderStatus.pending: frozenset({OrderStatus.paid, OrderStatus.cancelled}),
+    OrderStatus.paid: frozenset({OrderStatus.processing, OrderStatus.cancelled}),
+    OrderStatus.processing: frozenset({OrderStatus.shipped, OrderStatus.cancelled}),
+    OrderStatus.shipped: frozenset({OrderStatus.delivered}),
+    OrderStatus.delivered: frozenset(),
+    OrderStatus.cancelled: frozenset(),
+}
+
+# Order column stamped when an order enters the status
+STAMPS = {
+    OrderStatus.shipped: "shipped_at",
+    OrderStatus.delivered: "delivered_at",
+    OrderStatus.cancelled: "cancelled_at",
+}
+
+
+async def bump_order_counters(
+    session: AsyncSession, deltas: Dict[Tuple[int, OrderStatus], int]
+) -> None:
+    """
+    Applies (store_id, status) -> delta to StoreOrderCounter with one upsert.
+    Must run in the transaction that creates the orders or changes their
+    status. Rows are touched in key order so concurrent bumps can't deadlock.
+    """
+    rows = [
+        {"store_id": store_id, "status": status, "count": delta}
+        for (store_id, status), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = pg_insert(StoreOrderCounter).values(rows)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[StoreOrderCounter.store_id, StoreOrderCounter.status],
+            set_={"count": StoreOrderCounter.count + stmt.excluded.count},
+        )
+    )
+
+
+def can_transition(from_status: OrderStatus, to_status: OrderStatus) -> bool:
+    return to_status in TRANSITIONS[OrderStatus(from_status)]
+
+
+async def record_orders_placed(
+    session: AsyncSession,
+    user_id: int,
+    order_ids: List[int],
+    status: OrderStatus = OrderStatus.pending,
+) -> None:
+    """
+    Creation events for freshly inserted orders plus one "order.placed"
+    outbox message for the whole checkout. Runs in place_order's transaction.
+    """
+    now = datetime.now()
+    await session.execute(
+        insert(OrderEvent),
+        [
+            {
+                "order_id": order_id,
+                "from_status": None,
+                "to_status": status,
+                "actor_id": user_id,
+                "created_at": now,
+            }
+            for order_id in order_ids
+        ],
+    )
+    await outbox_service.enqueue(
+        session,
+        "order.placed",
+        [{"user_id": user_id, "order_ids": order_ids, "status": status.value}],
+    )
+
+
+async def transition_order(
+    session: AsyncSession,
+    order_id: int,
+    to_status: OrderStatus,
+    actor_id: Optional[int] = None,
+    note: Optional[str] = None,
+    from_statuses: Optional[frozenset] = None,
+) -> Order:
+    """
+    Moves an order to `to_status` if TRANSITIONS allows it, and the order is
+    in one of `from_statuses` when given (a narrower rule for some callers,
+    checked under the lock), else 409.
+
+    The order row is locked for the change. In the same transaction it
+    stamps shipped_at/delivered_at/cancelled_at, appends an OrderEvent,
+    moves the order between StoreOrderCounter rows, puts the stock of a
+    cancelled order back and enqueues an "order.status_changed" outbox
+    message for downstream consumers. Nothing is committed.
+    """
+    order = await session.get(Order, order_id, with_for_update=True)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    from_status = OrderStatus(order.status)
+    if not can_transition(from_status, to_status) or (
+        from_statuses is not None and from_status not in from_statuses
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Cannot move order from {from_status.value} to {to_status.value}",
+        )
+
+    now = datetime.now()
+    order.status = to_status
+    order.updated_at = now
+    if to_status in STAMPS:
+        setattr(order, STAMPS[to_status], now)
+    session.add(order)
+    session.add(
+        OrderEvent(
+            order_id=order.id,
+            from_status=from_status,
+            to_status=to_status,
+            actor_id=actor_id,
+            note=note,
+            created_at=now,
+        )
+    )
+    await bump_order_counters(
+        session, {(order.store_id, from_status): -1, (order.store_id, to_status): 1}
+    )
+
+    if to_status == OrderStatus.cancelled:
+        result = await session.execute(
+            select(OrderItem.product_id, OrderItem.quantity).where(
+                OrderItem.order_id == order.id
+            )
+        )
+        quantities: Dict[int, int] = defaultdict(int)
+        for product_id, quantity in result.all():
+            quantities[product_id] += quantity
+        await return_stock(session, quantities)
+
+    await outbox_service.enqueue(
+        session,
+        "order.status_changed",
+        [
+            {
+                "order_id": order.id,
+                "user_id": order.user_id,
+                "store_id": order.store_id,
+                "from_status": from_status.value,
+                "to_status": to_status.value,
+            }
+        ],
+    )
+    return order
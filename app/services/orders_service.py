@@ -0,0 +1,389 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, insert, tuple_, union_all
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.order import Order, OrderItem, OrderStatus, StoreOrderCounter
+from app.models.product import Product, ProductImage
+from app.models.user import User
+from app.models.vendor import Store, Vendor
+from app.schemas.order_schema import (
+    CheckoutItem,
+    Order as OrderSchema,
+    OrderFilter,
+    OrderHost,
+    OrderPage,
+    OrderProduct,
+    VendorOrder,
+    VendorOrderPage,
+)
+from app.services.inventory_service import commit_stock, take_stock
+from app.services.order_lifecycle import bump_order_counters, record_orders_placed
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def cart_quantities(cart: Iterable[CheckoutItem]) -> Dict[int, int]:
+    """
+    Quantity per product id, merging repeated lines. Rejects the whole cart
+    when any line has a malformed id or a non-positive quantity.
+    """
+    quantities: Dict[int, int] = defaultdict(int)
+    invalid = []
+    for item in cart:
+        try:
+            product_id = int(item.product_id)
+        except ValueError:
+            invalid.append(item.product_id)
+            continue
+        if item.quantity <= 0:
+            invalid.append(item.product_id)
+            continue
+        quantities[product_id] += item.quantity
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Invalid cart lines", "invalid": invalid},
+        )
+    return dict(quantities)
+
+
+async def place_order(
+    session: AsyncSession,
+    user_id: int,
+    cart: Iterable[CheckoutItem],
+    shipping_address_id: Optional[int] = None,
+    status: OrderStatus = OrderStatus.pending,
+    order_ref: Optional[str] = None,
+    prices: Optional[Dict[int, float]] = None,
+) -> List[int]:
+    """
+    Creates one order per store for a cart, takes the stock and returns the
+    new order ids. Stock reserved by checkout_confirm under `order_ref` is
+    used first, and `prices` (locked at checkout) override current prices.
+    Orders start out pending until payment moves them on (see
+    order_lifecycle); their creation events and an "order.placed" outbox
+    message are written alongside.
+
+    Apart from the per-product stock updates, the statement count doesn't
+    grow with the cart: one product fetch, one multi-row INSERT ... RETURNING
+    for the orders and one executemany for their items. Nothing is
+    committed; the caller owns the transaction, so a failure leaves no
+    partial orders or stock changes behind.
+    """
+    quantities = cart_quantities(cart)
+    if not quantities:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+
+    result = await session.execute(
+        select(Product.id, Product.store_id, Product.price, Product.is_active).where(
+            Product.id.in_(quantities)
+        )
+    )
+    products = {row.id: row for row in result.all()}
+
+    missing = sorted(pid for pid in quantities if pid not in products)
+    inactive = sorted(pid for pid, row in products.items() if not row.is_active)
+    if missing or inactive:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "message": "Some products are unavailable",
+                "missing": missing,
+                "inactive": inactive,
+            },
+        )
+
+    if order_ref:
+        await commit_stock(session, order_ref, user_id, quantities)
+    else:
+        await take_stock(session, quantities)
+
+    lines_by_store: Dict[int, List[dict]] = defaultdict(list)
+    for product_id in sorted(quantities):
+        product = products[product_id]
+        quantity = quantities[product_id]
+        price = prices[product_id] if prices else product.price
+        lines_by_store[product.store_id].append(
+            {
+                "product_id": product_id,
+                "quantity": quantity,
+                "unit_price": price,
+                "subtotal": price * quantity,
+            }
+        )
+
+    now = datetime.now()
+    store_ids = sorted(lines_by_store)
+    order_rows = []
+    for store_id in store_ids:
+        total = sum(line["subtotal"] for line in lines_by_store[store_id])
+        order_rows.append(
+            {
+                "user_id": user_id,
+                "store_id": store_id,
+                "status": status,
+                "total_amount": total,
+                "grand_total": total,
+                "shipping_address_id": shipping_address_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    # RETURNING rows come back in parameter order, so ids line up with store_ids
+    result = await session.execute(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        order_rows,
+    )
+    order_ids = result.scalars().all()
+
+    item_rows = [
+        {"order_id": order_id, **line}
+        for order_id, store_id in zip(order_ids, store_ids)
+        for line in lines_by_store[store_id]
+    ]
+    await session.execute(insert(OrderItem), item_rows)
+    order_ids = list(order_ids)
+    await bump_order_counters(
+        session, {(store_id, status): 1 for store_id in store_ids}
+    )
+    await record_orders_placed(session, user_id, order_ids, status)
+    return order_ids
+
+
+def order_thumbnail():
+    """
+    Correlated subquery for a product's thumbnail: its main image, else its
+    first image, else "".
+    """
+    return func.coalesce(
+        select(ProductImage.image_url)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.is_main.desc(), ProductImage.id)
+        .limit(1)
+        .scalar_subquery(),
+        "",
+    )
+
+
+def order_statuses(statuses: Optional[List[str]]) -> List[OrderStatus]:
+    try:
+        return [OrderStatus(status) for status in statuses or []]
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Unknown order status",
+                "allowed": [status.value for status in OrderStatus],
+            },
+        )
+
+
+def order_cursor(row: Row) -> str:
+    return encode_cursor({"k": row.created_at, "id": row.id})
+
+
+def order_cursor_position(cursor: str) -> Tuple[datetime, int]:
+    """
+    (created_at, id) to continue after, from an order_cursor.
+    """
+    payload = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(payload["k"]), int(payload["id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def order_history(
+    session: AsyncSession, user_id: int, filters: OrderFilter
+) -> OrderPage:
+    """
+    A buyer's orders, newest first. With cursor pagination one page at a
+    time, keyset-paginated on (created_at, id) along
+    ix_order_user_created_at_id; otherwise the whole history in one page.
+
+    Two column projections and no ORM graph: one query for the page of
+    orders with their host, one for the items of those orders with each
+    product's name and thumbnail resolved in SQL.
+    """
+    query = (
+        select(
+            Order.id,
+            Order.created_at,
+            Order.status,
+            Store.is_verified,
+            User.username,
+            User.profile_pic,
+        )
+        .join(Store, Store.id == Order.store_id)
+        .join(Vendor, Vendor.id == Store.vendor_id)
+        .join(User, User.id == Vendor.user_id)
+        .where(Order.user_id == user_id)
+    )
+    statuses = order_statuses(filters.status)
+    if statuses:
+        query = query.where(Order.status.in_(statuses))
+    use_cursor = filters.pagination == "cursor"
+    if use_cursor and filters.cursor:
+        position = order_cursor_position(filters.cursor)
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*position))
+    query = query.order_by(Order.created_at.desc(), Order.id.desc())
+    if use_cursor:
+        query = query.limit(filters.limit + 1)
+
+    result = await session.execute(query)
+    rows = result.all()
+    next_cursor = None
+    if use_cursor and len(rows) > filters.limit:
+        rows = rows[: filters.limit]
+        next_cursor = order_cursor(rows[-1])
+
+    products: Dict[int, List[OrderProduct]] = defaultdict(list)
+    if rows:
+        result = await session.execute(
+            select(
+                OrderItem.order_id,
+                OrderItem.quantity,
+                Product.name,
+                order_thumbnail().label("thumbnail"),
+            )
+            .join(Product, Product.id == OrderItem.product_id)
+            .where(OrderItem.order_id.in_([row.id for row in rows]))
+            .order_by(OrderItem.order_id, OrderItem.id)
+        )
+        for item in result.all():
+            products[item.order_id].append(
+                OrderProduct(
+                    title=item.name,
+                    thumbnail=item.thumbnail,
+                    amount=item.quantity,
+                    attributes={},  # Frontend handles attributes display
+                )
+            )
+
+    items = [
+        OrderSchema(
+            id=str(row.id),
+            created_at=row.created_at,
+            delivered=row.status == OrderStatus.delivered,
+            ready=row.status
+            in (OrderStatus.paid, OrderStatus.processing, OrderStatus.shipped),
+            host=OrderHost(
+                username=row.username or "unknown",
+                profile_pic=row.profile_pic,
+                verification="gold" if row.is_verified else "bronze",
+            ),
+            products=products[row.id],
+        )
+        for row in rows
+    ]
+    return OrderPage(items=items, next_cursor=next_cursor)
+
+
+# Above this many (store, status) queues the inbox falls back to one query
+MAX_INBOX_QUEUES = 64
+
+
+async def store_order_inbox(
+    session: AsyncSession,
+    store_ids: List[int],
+    statuses: List[OrderStatus],
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> VendorOrderPage:
+    """
+    One page of the orders placed against `store_ids`, newest first, keyset
+    paginated on (created_at, id). All statuses when `statuses` is empty.
+
+    Each (store, status) pair is read as its own queue, a range scan on
+    ix_order_store_status_created_at_id stopping after `limit` + 1 rows; the
+    queues are merged with UNION ALL, so a page never sorts more than
+    queues * (limit + 1) rows however many orders the stores have.
+    """
+    if not store_ids:
+        return VendorOrderPage(items=[])
+    statuses = statuses or list(OrderStatus)
+    position = order_cursor_position(cursor) if cursor else None
+    columns = (
+        Order.id,
+        Order.store_id,
+        Order.user_id,
+        Order.status,
+        Order.grand_total,
+        Order.created_at,
+    )
+
+    def queue(*criteria):
+        query = select(*columns).where(*criteria)
+        if position:
+            query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*position))
+        return query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+
+    if len(store_ids) * len(statuses) <= MAX_INBOX_QUEUES:
+        queues = [
+            queue(Order.store_id == store_id, Order.status == status)
+            for store_id in store_ids
+            for status in statuses
+        ]
+        page = (
+            union_all(*queues).subquery() if len(queues) > 1 else queues[0].subquery()
+        )
+    else:
+        page = queue(
+            Order.store_id.in_(store_ids), Order.status.in_(statuses)
+        ).subquery()
+
+    item_count = (
+        select(func.count(OrderItem.id))
+        .where(OrderItem.order_id == page.c.id)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(page, User.username, item_count.label("item_count"))
+        .join(User, User.id == page.c.user_id)
+        .order_by(page.c.created_at.desc(), page.c.id.desc())
+        .limit(limit + 1)
+    )
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = order_cursor(rows[-1])
+
+    items = [
+        VendorOrder(
+            id=row.id,
+            store_id=row.store_id,
+            status=OrderStatus(row.status).value,
+            grand_total=row.grand_total,
+            item_count=row.item_count,
+            buyer=row.username or "unknown",
+            created_at=row.created_at,
+        )
+        for row in rows
+    ]
+    return VendorOrderPage(items=items, next_cursor=next_cursor)
+
+
+async def store_order_counts(
+    session: AsyncSession, store_ids: List[int]
+) -> Dict[str, int]:
+    """
+    Orders per status over `store_ids`, summed from StoreOrderCounter rows
+    (at most one per store and status) instead of counting orders.
+    """
+    counts = {status.value: 0 for status in OrderStatus}
+    if not store_ids:
+        return counts
+    result = await session.execute(
+        select(StoreOrderCounter.status, func.sum(StoreOrderCounter.count))
+        .where(StoreOrderCounter.store_id.in_(store_ids))
+        .group_by(StoreOrderCounter.status)
+    )
+    for status, count in result.all():
+        counts[OrderStatus(status).value] = int(count)
+    return counts
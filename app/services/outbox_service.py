@@ -0,0 +1,98 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.outbox import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_handlers: Dict[str, List[Handler]] = defaultdict(list)
+
+
+def subscribe(topic: str):
+    """
+    Registers an async handler for an outbox topic:
+
+        @subscribe("order.placed")
+        async def send_receipt(payload): ...
+
+    Delivery is at least once: a message is retried as a whole when any of
+    its handlers fails, so handlers must tolerate seeing it again.
+    """
+
+    def register(handler: Handler) -> Handler:
+        _handlers[topic].append(handler)
+        return handler
+
+    return register
+
+
+async def enqueue(session: AsyncSession, topic: str, payloads: List[dict]) -> None:
+    """
+    Records one message per payload in the caller's transaction, so it is
+    published exactly when the change that caused it commits.
+    """
+    if not payloads:
+        return
+    now = datetime.now()
+    await session.execute(
+        insert(OutboxMessage),
+        [
+            {"topic": topic, "payload": payload, "available_at": now, "created_at": now}
+            for payload in payloads
+        ],
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(2**attempts, 300))
+
+
+async def drain_outbox(session: AsyncSession, batch_size: int = 100) -> int:
+    """
+    Hands up to `batch_size` due messages to their handlers and marks them
+    processed; failed ones are retried with exponential backoff and given up
+    on (processed, with last_error kept) after OUTBOX_MAX_ATTEMPTS.
+
+    Claimed rows stay locked until the caller commits, and SKIP LOCKED lets
+    several drainers work side by side without handing out a message twice.
+    Returns the number of messages claimed.
+    """
+    now = datetime.now()
+    result = await session.execute(
+        select(OutboxMessage)
+        .where(OutboxMessage.processed_at.is_(None), OutboxMessage.available_at <= now)
+        .order_by(OutboxMessage.available_at, OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    messages = result.scalars().all()
+    for message in messages:
+        try:
+            for handler in _handlers.get(message.topic, []):
+                await handler(message.payload)
+        except Exception as exc:
+            message.attempts += 1
+            message.last_error = repr(exc)[:1000]
+            if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                logger.error(
+                    "Giving up on outbox message %s (%s) after %s attempts",
+                    message.id,
+                    message.topic,
+                    message.attempts,
+                )
+                message.processed_at = datetime.now()
+            else:
+                message.available_at = datetime.now() + retry_delay(message.attempts)
+        else:
+            message.processed_at = datetime.now()
+        session.add(message)
+    return len(messages)
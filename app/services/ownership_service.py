@@ -0,0 +1,87 @@
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy import exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import user_cache
+from app.models.product import Product
+from app.models.vendor import Store, Vendor
+
+
+def _stores_cache_key(user_id: int) -> str:
+    return f"user:{user_id}:stores"
+
+
+async def get_vendor_store_ids(session: AsyncSession, user_id: int) -> List[int]:
+    """
+    Ids of the stores owned by a user through their vendor profile, resolved
+    with one joined query and cached per user. Empty for non-vendors.
+    """
+    key = _stores_cache_key(user_id)
+    cached = await user_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await session.execute(
+        select(Store.id)
+        .select_from(Vendor)
+        .join(Store, Store.vendor_id == Vendor.id)
+        .where(Vendor.user_id == user_id)
+        .order_by(Store.id)
+    )
+    store_ids = list(result.scalars().all())
+    await user_cache.set(key, store_ids, tags=[key])
+    return store_ids
+
+
+async def invalidate_vendor_stores(user_id: int) -> None:
+    """
+    Call after committing a change to which stores a user owns.
+    """
+    await user_cache.invalidate(_stores_cache_key(user_id))
+
+
+def owned_by(user_id: int):
+    """
+    EXISTS predicate: the correlated Product belongs to one of the user's stores.
+    """
+    return (
+        exists()
+        .where(
+            Store.id == Product.store_id,
+            Vendor.id == Store.vendor_id,
+            Vendor.user_id == user_id,
+        )
+        .correlate(Product)
+    )
+
+
+async def owns_product(session: AsyncSession, user_id: int, product_id: int) -> bool:
+    owned = await session.scalar(
+        select(owned_by(user_id)).where(Product.id == product_id)
+    )
+    return bool(owned)
+
+
+async def verify_product_owner(
+    session: AsyncSession,
+    user_id: int,
+    product_id: int,
+    detail: str = "Not authorized to modify this product.",
+    active_only: bool = True,
+) -> None:
+    """
+    Raises 404 when the product doesn't exist (or is deactivated, with
+    active_only) and 403 when it isn't in one of the user's stores.
+    One query, no Product loaded.
+    """
+    result = await session.execute(
+        select(Product.is_active, owned_by(user_id)).where(Product.id == product_id)
+    )
+    row = result.first()
+    if row is None or (active_only and not row[0]):
+        raise HTTPException(status_code=404, detail="Product not found")
+    if not row[1]:
+        raise HTTPException(status_code=403, detail=detail)
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.user import (
+    Permission,
+    Role,
+    RolePermissionLink,
+    UserPermissionOverride,
+    UserRoleLink,
+)
+
+
+@dataclass(frozen=True)
+class EffectivePermissions:
+    """
+    A user's roles and their effective permissions (roles plus overrides) as
+    a bitset: bit n is set when the permission with id n is granted.
+    """
+
+    roles: Tuple[str, ...]
+    bits: int
+
+    @property
+    def primary_role(self) -> Optional[str]:
+        return self.roles[0] if self.roles else None
+
+    def has(self, bit: Optional[int]) -> bool:
+        return bit is not None and bool(self.bits >> bit & 1)
+
+
+class PermissionEngine:
+    """
+    Computes and caches effective permissions per user.
+
+    Entries expire after `ttl` seconds. Roles, permissions and their links
+    are only changed outside the app (the RBAC seeder, SQL), so a revoked
+    permission keeps working for up to `ttl` seconds in each worker.
+    invalidate_user() drops a single user at once, for handlers that change
+    that user's roles or overrides.
+    """
+
+    def __init__(self, ttl: int, max_entries: int = 50_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._codes: Dict[str, int] = {}
+        self._codes_loaded_at: Optional[float] = None
+        self._entries: "OrderedDict[int, Tuple[float, EffectivePermissions]]" = (
+            OrderedDict()
+        )
+        self._lock = asyncio.Lock()
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    async def bit_for(self, session: AsyncSession, code: str) -> Optional[int]:
+        """
+        Bit position of a permission code; None for codes that don't exist.
+        """
+        if self._codes_stale(code):
+            async with self._lock:
+                if self._codes_stale(code):
+                    result = await session.execute(
+                        select(Permission.code, Permission.id)
+                    )
+                    self._codes = dict(result.all())
+                    self._codes_loaded_at = time.monotonic()
+        return self._codes.get(code)
+
+    def _codes_stale(self, code: str) -> bool:
+        if self._codes_loaded_at is None:
+            return True
+        # Unknown codes reload at most once per TTL (a permission may have
+        # been seeded since), so a typo can't cost a query per request
+        return (
+            code not in self._codes
+            and time.monotonic() - self._codes_loaded_at > self.ttl
+        )
+
+    async def for_user(
+        self, session: AsyncSession, user_id: int
+    ) -> EffectivePermissions:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, permissions = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return permissions
+
+        permissions = await self._compute(session, user_id)
+        self._entries[user_id] = (time.monotonic() + self.ttl, permissions)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return permissions
+
+    async def has_permission(
+        self, session: AsyncSession, user_id: int, code: str
+    ) -> bool:
+        bit = await self.bit_for(session, code)
+        return (await self.for_user(session, user_id)).has(bit)
+
+    async def _compute(
+        self, session: AsyncSession, user_id: int
+    ) -> EffectivePermissions:
+        role_rows = await session.execute(
+            select(Role.name, RolePermissionLink.permission_id)
+            .select_from(UserRoleLink)
+            .join(Role, Role.id == UserRoleLink.role_id)
+            .outerjoin(RolePermissionLink, RolePermissionLink.role_id == Role.id)
+            .where(UserRoleLink.user_id == user_id)
+            .order_by(UserRoleLink.id)
+        )
+        override_rows = await session.execute(
+            select(
+                UserPermissionOverride.permission_id,
+                UserPermissionOverride.is_granted,
+            )
+            .where(UserPermissionOverride.user_id == user_id)
+            .order_by(UserPermissionOverride.id)
+        )
+
+        roles = []
+        bits = 0
+        for role_name, permission_id in role_rows.all():
+            if role_name not in roles:
+                roles.append(role_name)
+            if permission_id is not None:
+                bits |= 1 << permission_id
+        # Overrides win over roles; the latest override of a permission wins
+        for permission_id, is_granted in override_rows.all():
+            if is_granted:
+                bits |= 1 << permission_id
+            else:
+                bits &= ~(1 << permission_id)
+        return EffectivePermissions(roles=tuple(roles), bits=bits)
+
+
+permission_engine = PermissionEngine(
+    ttl=settings.PERMISSION_CACHE_TTL_SECONDS,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,345 @@
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, literal_column, or_, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from sqlmodel import select
+
+from app.models.product import Product, ProductImage, SEARCH_CONFIG
+from app.models.user import User
+from app.models.vendor import Store, Vendor
+from app.core.config import settings
+from app.schemas.product_shema import (
+    FacetCount,
+    PriceBucketCount,
+    ProductDisplay,
+    ProductFacets,
+    ProductFilter,
+    ProductSort,
+)
+from app.schemas.vendor_schema import VendorInfo
+from app.services.category_tree import subtree_ids_query
+from app.utils.pagination import decode_cursor, encode_cursor
+
+_SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_search_tsquery(term: str) -> Optional[str]:
+    """
+    Turns free text into a prefix-matching tsquery, e.g. "red sho" -> "red:* & sho:*".
+    Returns None when the term has no searchable tokens.
+    """
+    tokens = _SEARCH_TOKEN.findall(term.lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+async def category_subtree(
+    session: AsyncSession, filters: ProductFilter
+) -> Optional[Select]:
+    """
+    Subquery of the category ids to match when include_descendants is set,
+    else None.
+    """
+    if not (filters.include_descendants and filters.category_id):
+        return None
+    return await subtree_ids_query(session, filters.category_id)
+
+
+def filter_cache_params(filters: ProductFilter) -> dict:
+    """
+    ProductFilter normalized for use as a cache key: equivalent filters that
+    yield the same rows map to the same parameters.
+    """
+    params = filters.model_dump(mode="json")
+    search = (params.get("search") or "").strip().lower()
+    params["search"] = search or None
+    if filters.pagination == "cursor":
+        params.pop("skip")
+    else:
+        params.pop("cursor")
+    return params
+
+
+def apply_product_filters(
+    query: Select, filters: ProductFilter, subtree: Optional[Select] = None
+) -> Select:
+    """
+    Applies the ProductFilter predicates to a query selecting from Product.
+    subtree, a category id subquery from category_subtree, replaces the exact
+    category_id match when given.
+    """
+    if filters.store_id:
+        query = query.where(Product.store_id == filters.store_id)
+    if subtree is not None:
+        query = query.where(Product.category_id.in_(subtree))
+    elif filters.category_id:
+        query = query.where(Product.category_id == filters.category_id)
+    if filters.min_price is not None:
+        query = query.where(Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.where(Product.price <= filters.max_price)
+    if filters.search and filters.search.strip():
+        query = query.where(search_predicate(filters.search))
+    return query
+
+
+def search_predicate(term: str):
+    """
+    Matches the search vector, plus plain substring matches so that results for
+    partial words (e.g. "phone" in "iPhone") are kept. Both sides are served by
+    GIN indexes (tsvector and pg_trgm), so Postgres can BitmapOr them.
+    """
+    pattern = f"%{term.strip().lower()}%"
+    substring = or_(Product.name.ilike(pattern), Product.description.ilike(pattern))
+    tsquery = build_search_tsquery(term)
+    if tsquery is None:
+        return substring
+    return or_(
+        Product.search_vector.op("@@")(func.to_tsquery(SEARCH_CONFIG, tsquery)),
+        substring,
+    )
+
+
+def search_rank(term: str):
+    """
+    Relevance of a product for the search term; name hits outrank description hits.
+    """
+    name_hit = case((Product.name.ilike(f"%{term.strip().lower()}%"), 1.0), else_=0.0)
+    tsquery = build_search_tsquery(term)
+    if tsquery is None:
+        return name_hit
+    return (
+        func.ts_rank_cd(Product.search_vector, func.to_tsquery(SEARCH_CONFIG, tsquery))
+        + name_hit
+    )
+
+
+# sort -> (key column, descending). Product.id breaks ties; each pair is backed
+# by a partial (key, id) index on active products.
+SORT_KEYS = {
+    ProductSort.newest: (Product.created_at, True),
+    ProductSort.price_asc: (Product.price, False),
+    ProductSort.price_desc: (Product.price, True),
+    ProductSort.rating: (Product.rating_avg, True),
+}
+
+
+def apply_product_sort(query: Select, sort: ProductSort) -> Select:
+    column, descending = SORT_KEYS[sort]
+    if descending:
+        return query.order_by(column.desc(), Product.id.desc())
+    return query.order_by(column.asc(), Product.id.asc())
+
+
+def apply_product_cursor(query: Select, sort: ProductSort, cursor: str) -> Select:
+    """
+    Restricts the query to rows after the cursor position (keyset pagination).
+    """
+    payload = decode_cursor(cursor)
+    if payload.get("s") != sort.value or "k" not in payload or "id" not in payload:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort")
+
+    column, descending = SORT_KEYS[sort]
+    parse_key = datetime.fromisoformat if sort == ProductSort.newest else float
+    try:
+        key, last_id = parse_key(payload["k"]), int(payload["id"])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    position = tuple_(column, Product.id)
+    if descending:
+        return query.where(position < tuple_(key, last_id))
+    return query.where(position > tuple_(key, last_id))
+
+
+def product_cursor(product: Product, sort: ProductSort) -> str:
+    column, _ = SORT_KEYS[sort]
+    return encode_cursor(
+        {"s": sort.value, "k": getattr(product, column.key), "id": product.id}
+    )
+
+
+def product_display_query() -> Select:
+    """
+    Selects only the columns needed to build ProductDisplay/VendorInfo, so no
+    ORM graph (store, category, images, reviews) is loaded for listings.
+    """
+    return (
+        select(
+            Product.id,
+            Product.name,
+            Product.price,
+            Product.discount_price,
+            Product.stock,
+            Product.description,
+            Product.category_id,
+            Product.created_at,
+            Product.updated_at,
+            Product.rating_avg,
+            Store.id.label("store_id"),
+            Store.store_name,
+            Store.is_verified,
+            Vendor.id.label("vendor_id"),
+            User.id.label("vendor_user_id"),
+            User.username,
+            User.profile_pic,
+        )
+        .select_from(Product)
+        .outerjoin(Store, Store.id == Product.store_id)
+        .outerjoin(Vendor, Vendor.id == Store.vendor_id)
+        .outerjoin(User, User.id == Vendor.user_id)
+    )
+
+
+async def load_product_images(
+    session: AsyncSession, product_ids: Iterable[int]
+) -> Dict[int, List[str]]:
+    """
+    Image urls per product, gathered with a single aggregated query.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+    result = await session.execute(
+        select(
+            ProductImage.product_id,
+            func.array_agg(aggregate_order_by(ProductImage.image_url, ProductImage.id)),
+        )
+        .where(ProductImage.product_id.in_(product_ids))
+        .group_by(ProductImage.product_id)
+    )
+    return {product_id: list(urls) for product_id, urls in result.all()}
+
+
+async def count_products_by_category(
+    session: AsyncSession, category_ids: Iterable[int]
+) -> Dict[int, Tuple[int, int]]:
+    """
+    (product_count, active_product_count) per category, in one grouped query.
+    Categories without products are absent from the result.
+    """
+    category_ids = list(category_ids)
+    if not category_ids:
+        return {}
+    result = await session.execute(
+        select(
+            Product.category_id,
+            func.count(Product.id),
+            func.count(Product.id).filter(Product.is_active),
+        )
+        .where(Product.category_id.in_(category_ids))
+        .group_by(Product.category_id)
+    )
+    return {category_id: (total, active) for category_id, total, active in result.all()}
+
+
+def build_product_display(row: Row, images: List[str]) -> ProductDisplay:
+    has_store = row.store_id is not None
+    has_vendor_user = row.vendor_user_id is not None
+    host_info = VendorInfo(
+        id=row.vendor_id,
+        username=row.username if has_vendor_user else "anonymous",
+        profile_pic=row.profile_pic
+        if has_vendor_user
+        else "assets/images/faces/user1.jfif",
+        verification="verified" if has_store and row.is_verified else "null",
+        address=row.store_name if has_store else "N/A",
+    )
+    return ProductDisplay(
+        id=row.id,
+        title=row.name,
+        price=row.price,
+        discount_price=row.discount_price,
+        stock=row.stock,
+        unit_type="Item",
+        description=row.description,
+        category_id=row.category_id,
+        host_id=row.vendor_id,
+        images=images,
+        host=host_info,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+        average_rating=row.rating_avg or 0.0,
+    )
+
+
+async def build_product_displays(
+    session: AsyncSession, rows: Sequence[Row]
+) -> List[ProductDisplay]:
+    """
+    Turns product_display_query() rows into ProductDisplay objects, in row order.
+    """
+    images = await load_product_images(session, [row.id for row in rows])
+    return [build_product_display(row, images.get(row.id, [])) for row in rows]
+
+
+# grouping() bitmask -> facet, for grouping(category_id, store_id, price_bucket)
+_FACET_BY_CATEGORY = 0b011
+_FACET_BY_STORE = 0b101
+_FACET_BY_PRICE = 0b110
+_FACET_TOTAL = 0b111
+
+
+async def compute_product_facets(
+    session: AsyncSession,
+    filters: ProductFilter,
+    subtree: Optional[Select] = None,
+) -> ProductFacets:
+    """
+    Category, store and price-bucket counts for the active products matching
+    the filter, computed in one pass with GROUPING SETS.
+    """
+    boundaries = sorted(float(b) for b in settings.PRICE_FACET_BOUNDARIES)
+    # Inlined (numeric only) so SELECT and GROUP BY use the identical expression
+    thresholds = literal_column(f"ARRAY[{', '.join(map(repr, boundaries))}]::float8[]")
+    price_bucket = func.width_bucket(Product.price, thresholds)
+
+    query = (
+        select(
+            func.grouping(Product.category_id, Product.store_id, price_bucket),
+            Product.category_id,
+            Product.store_id,
+            price_bucket,
+            func.count(),
+        )
+        .where(Product.is_active)
+        .group_by(
+            func.grouping_sets(
+                tuple_(Product.category_id),
+                tuple_(Product.store_id),
+                tuple_(price_bucket),
+                tuple_(),
+            )
+        )
+    )
+    query = apply_product_filters(query, filters, subtree)
+    result = await session.execute(query)
+
+    facets = ProductFacets(total=0)
+    for grouping, category_id, store_id, bucket, count in result.all():
+        if grouping == _FACET_TOTAL:
+            facets.total = count
+        elif grouping == _FACET_BY_CATEGORY:
+            facets.categories.append(FacetCount(id=category_id, count=count))
+        elif grouping == _FACET_BY_STORE:
+            facets.stores.append(FacetCount(id=store_id, count=count))
+        elif grouping == _FACET_BY_PRICE:
+            # width_bucket: 0 is below the first bound, len(bounds) is the open top
+            facets.price_buckets.append(
+                PriceBucketCount(
+                    min_price=boundaries[bucket - 1] if bucket > 0 else None,
+                    max_price=boundaries[bucket] if bucket < len(boundaries) else None,
+                    count=count,
+                )
+            )
+
+    facets.categories.sort(key=lambda f: f.count, reverse=True)
+    facets.stores.sort(key=lambda f: f.count, reverse=True)
+    facets.price_buckets.sort(key=lambda b: -1 if b.min_price is None else b.min_price)
+    return facets
@@ -0,0 +1,54 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.product import Product, Review
+
+
+async def apply_rating_change(
+    session: AsyncSession, product_id: int, rating_delta: int, count_delta: int
+) -> None:
+    """
+    Adjusts the denormalized review aggregates of a product in the caller's
+    transaction. The increment happens in SQL so concurrent reviews don't race.
+    """
+    await session.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(
+            rating_sum=Product.rating_sum + rating_delta,
+            rating_count=Product.rating_count + count_delta,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def recompute_product_ratings(
+    session: AsyncSession, product_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Rebuilds rating_sum/rating_count from the review table, for the given
+    products or for the whole catalog. Returns the number of reviewed products.
+    """
+    reset = update(Product).values(rating_sum=0, rating_count=0)
+    totals = select(
+        Review.product_id,
+        func.sum(Review.rating).label("rating_sum"),
+        func.count(Review.id).label("rating_count"),
+    ).group_by(Review.product_id)
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        reset = reset.where(Product.id.in_(product_ids))
+        totals = totals.where(Review.product_id.in_(product_ids))
+    totals = totals.subquery()
+
+    await session.execute(reset.execution_options(synchronize_session=False))
+    result = await session.execute(
+        update(Product)
+        .where(Product.id == totals.c.product_id)
+        .values(rating_sum=totals.c.rating_sum, rating_count=totals.c.rating_count)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,55 @@
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.product import Product
+from app.models.vendor import Store
+from app.schemas.vendor_schema import StoreRead
+
+
+async def load_store_stats(
+    session: AsyncSession, store_ids: Iterable[int]
+) -> Dict[int, Tuple[int, int, int]]:
+    """
+    (product_count, rating_sum, rating_count) over the active products of each
+    store, in one grouped query over the per-product review aggregates.
+    Stores without active products are absent from the result.
+    """
+    store_ids = list(store_ids)
+    if not store_ids:
+        return {}
+    result = await session.execute(
+        select(
+            Product.store_id,
+            func.count(Product.id),
+            func.coalesce(func.sum(Product.rating_sum), 0),
+            func.coalesce(func.sum(Product.rating_count), 0),
+        )
+        .where(Product.store_id.in_(store_ids), Product.is_active)
+        .group_by(Product.store_id)
+    )
+    return {
+        store_id: (products, rating_sum, rating_count)
+        for store_id, products, rating_sum, rating_count in result.all()
+    }
+
+
+async def with_store_stats(
+    session: AsyncSession, stores: List[Store]
+) -> List[StoreRead]:
+    """
+    StoreRead payloads whose product_count and rating come from live data
+    rather than the stored Store.rating column.
+    """
+    stats = await load_store_stats(session, [store.id for store in stores])
+    reads = []
+    for store in stores:
+        products, rating_sum, rating_count = stats.get(store.id, (0, 0, 0))
+        read = StoreRead.model_validate(store, from_attributes=True)
+        read.product_count = products
+        read.rating_count = rating_count
+        read.rating = rating_sum / rating_count if rating_count else 0.0
+        reads.append(read)
+    return reads
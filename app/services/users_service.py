@@ -1,6 +1,10 @@
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.core.cache import user_cache
 from app.models.user import User
+from app.schemas.auth_schema import CurrentUser
 
 
 async def get_all_usernames(session: AsyncSession):
@@ -9,3 +13,44 @@ async def get_all_usernames(session: AsyncSession):
     """
     result = await session.execute(select(User.username))
     return [row[0] for row in result.fetchall() if row[0] is not None]
+
+
+def _user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+async def load_current_user(
+    session: AsyncSession, user_id: int
+) -> Optional[CurrentUser]:
+    """
+    Identity snapshot of a user, served from the user cache when possible.
+    """
+    key = _user_cache_key(user_id)
+    cached = await user_cache.get(key)
+    if cached is not None:
+        return CurrentUser(**cached)
+
+    result = await session.execute(
+        select(
+            User.id,
+            User.username,
+            User.profile_pic,
+            User.is_active,
+            User.is_admin,
+            User.is_vendor,
+        ).where(User.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    snapshot = CurrentUser.model_validate(row)
+    await user_cache.set(key, snapshot.model_dump(), tags=[key])
+    return snapshot
+
+
+async def invalidate_current_user(user_id: int) -> None:
+    """
+    Drops a cached snapshot; call after committing a change to the user's
+    username, profile picture or flags.
+    """
+    await user_cache.invalidate(_user_cache_key(user_id))
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+
+from app.db.session import AsyncSessionLocal
+from app.services.checkout_service import delete_stale_checkouts
+from app.services.inventory_service import (
+    invalidate_moved_stock,
+    release_expired_reservations,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+async def sweep_expired_checkouts(interval: int) -> None:
+    """
+    Background loop handing the stock of expired checkout reservations back,
+    one committed batch at a time, and dropping stale checkout sessions.
+    Runs for the life of the app.
+    """
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                while True:
+                    released = await release_expired_reservations(session, BATCH_SIZE)
+                    await session.commit()
+                    await invalidate_moved_stock(session)
+                    if released:
+                        logger.info("Released %s expired stock reservations", released)
+                    if released < BATCH_SIZE:
+                        break
+                deleted = await delete_stale_checkouts(session)
+                await session.commit()
+                if deleted:
+                    logger.info("Deleted %s stale checkout sessions", deleted)
+        except Exception:
+            logger.exception("Sweeping expired checkouts failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,25 @@
+import asyncio
+import logging
+
+from app.db.session import AsyncSessionLocal
+from app.services.outbox_service import drain_outbox
+
+logger = logging.getLogger(__name__)
+
+
+async def drain_outbox_forever(interval: float, batch_size: int) -> None:
+    """
+    Background loop carrying out outbox messages, one committed batch at a
+    time. Full batches are followed up right away; otherwise it sleeps for
+    `interval`. Runs for the life of the app.
+    """
+    while True:
+        claimed = 0
+        try:
+            async with AsyncSessionLocal() as session:
+                claimed = await drain_outbox(session, batch_size)
+                await session.commit()
+        except Exception:
+            logger.exception("Draining the outbox failed")
+        if claimed < batch_size:
+            await asyncio.sleep(interval)
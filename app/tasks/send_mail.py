@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from sqlmodel import select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.user import User
+from app.models.vendor import Store
+from app.services.outbox_service import subscribe
+from app.utils.email import (
+    MailTemplates,
+    OutgoingMail,
+    SmtpConnection,
+    build_message,
+    is_permanent,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """
+    In-process outbound mail queue. send() only renders and enqueues, so
+    callers never wait on SMTP. A pool of sender tasks drains the queue,
+    each shipping up to `batch_size` mails per round over its own reused
+    SMTP connection in a worker thread. Failed mails are retried with
+    exponential backoff up to `max_attempts`; permanent (5xx) failures are
+    dropped at once. The SMTP server defaults to the SMTP_* settings.
+    """
+
+    def __init__(
+        self,
+        senders: int = settings.MAIL_SENDERS,
+        batch_size: int = settings.MAIL_BATCH_SIZE,
+        max_size: int = settings.MAIL_QUEUE_MAX_SIZE,
+        max_attempts: int = settings.MAIL_MAX_ATTEMPTS,
+        retry_delay: float = 1.0,
+        templates: Optional[MailTemplates] = None,
+        smtp_host: Optional[str] = settings.SMTP_HOST,
+        smtp_port: int = settings.SMTP_PORT,
+        smtp_starttls: bool = settings.SMTP_STARTTLS,
+    ):
+        self.senders = senders
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.templates = templates or MailTemplates()
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.smtp_starttls = smtp_starttls
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self._stats: Dict[str, int] = defaultdict(int)
+
+    def connection(self) -> Optional[SmtpConnection]:
+        if not self.smtp_host:
+            return None
+        return SmtpConnection(
+            self.smtp_host,
+            self.smtp_port,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            starttls=self.smtp_starttls,
+            use_ssl=settings.SMTP_USE_SSL,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+        )
+
+    def start(self) -> None:
+        """
+        Compiles the templates and starts the senders; call from the lifespan.
+        """
+        self.templates.load()
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [
+            asyncio.create_task(self._sender(self.connection()))
+            for _ in range(self.senders)
+        ]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Gives queued mails up to `timeout` seconds to go out, then stops.
+        Mails still waiting for a retry are dropped.
+        """
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %s mails unsent", self._queue.qsize())
+        for task in [*self._workers, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def send(self, template: str, to: str, **context) -> bool:
+        """
+        Renders `template` for `to` and queues it. Never blocks; returns False
+        when the mail was dropped because the queue is full or not running.
+        """
+        context.setdefault("app_name", settings.MAIL_BRAND)
+        return self.enqueue(self.templates.render(template, to, **context))
+
+    def enqueue(self, mail: OutgoingMail) -> bool:
+        if self._queue is None:
+            logger.warning("Mail queue not running, dropped mail to %s", mail.to)
+            self._stats["dropped"] += 1
+            return False
+        try:
+            self._queue.put_nowait(mail)
+        except asyncio.QueueFull:
+            logger.error("Mail queue full, dropped mail to %s", mail.to)
+            self._stats["dropped"] += 1
+            return False
+        self._stats["queued"] += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._stats["queued"],
+            "sent": self._stats["sent"],
+            "retried": self._stats["retried"],
+            "failed": self._stats["failed"],
+            "dropped": self._stats["dropped"],
+            "waiting": self._queue.qsize() if self._queue else 0,
+            "senders": len(self._workers),
+        }
+
+    async def _sender(self, connection: Optional[SmtpConnection]) -> None:
+        queue = self._queue
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                try:
+                    await self._deliver(connection, batch)
+                finally:
+                    for _ in batch:
+                        queue.task_done()
+        finally:
+            if connection is not None:
+                await asyncio.to_thread(connection.close)
+
+    async def _deliver(
+        self, connection: Optional[SmtpConnection], batch: List[OutgoingMail]
+    ) -> None:
+        if connection is None:
+            for mail in batch:
+                logger.info(
+                    "Mail to %s (SMTP not configured): %s", mail.to, mail.subject
+                )
+            self._stats["sent"] += len(batch)
+            return
+
+        messages = [build_message(mail, settings.MAIL_FROM) for mail in batch]
+        try:
+            errors = await asyncio.to_thread(connection.send_batch, messages)
+        except Exception as exc:
+            errors = [exc] * len(batch)
+        for mail, error in zip(batch, errors):
+            if error is None:
+                self._stats["sent"] += 1
+            else:
+                self._retry_later(mail, error)
+
+    def _retry_later(self, mail: OutgoingMail, error: Exception) -> None:
+        mail.attempts += 1
+        if is_permanent(error) or mail.attempts >= self.max_attempts:
+            logger.error(
+                "Giving up on mail to %s after %s attempts: %r",
+                mail.to,
+                mail.attempts,
+                error,
+            )
+            self._stats["failed"] += 1
+            return
+        self._stats["retried"] += 1
+        delay = min(self.retry_delay * 2**mail.attempts, 300)
+        task = asyncio.create_task(self._requeue(mail, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue(self, mail: OutgoingMail, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self.enqueue(mail)
+
+
+mail_queue = MailQueue()
+
+
+# ─── Outbox consumers ────────────────────────────────────────────────────────
+@subscribe("user.signed_up")
+async def send_welcome_mail(payload: dict) -> None:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(User.email, User.username).where(User.id == payload["user_id"])
+        )
+        user = result.first()
+    if user and not mail_queue.send("welcome", user.email, username=user.username):
+        # Let the outbox retry it later
+        raise RuntimeError("Mail queue unavailable")
+
+
+@subscribe("order.placed")
+async def send_order_receipt(payload: dict) -> None:
+    order_ids = payload["order_ids"]
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(User.email, User.username).where(User.id == payload["user_id"])
+        )
+        user = result.first()
+        if not user:
+            return
+        result = await session.execute(
+            select(Order.id, Order.grand_total, Store.store_name)
+            .join(Store, Store.id == Order.store_id)
+            .where(Order.id.in_(order_ids))
+            .order_by(Order.id)
+        )
+        orders = [
+            {"id": row.id, "store_name": row.store_name, "grand_total": row.grand_total}
+            for row in result.all()
+        ]
+        result = await session.execute(
+            select(
+                OrderItem.order_id, OrderItem.quantity, OrderItem.subtotal, Product.name
+            )
+            .join(Product, Product.id == OrderItem.product_id)
+            .where(OrderItem.order_id.in_(order_ids))
+            .order_by(OrderItem.id)
+        )
+        lines: Dict[int, List[dict]] = defaultdict(list)
+        for row in result.all():
+            lines[row.order_id].append(
+                {"quantity": row.quantity, "name": row.name, "subtotal": row.subtotal}
+            )
+    for order in orders:
+        order["lines"] = lines[order["id"]]
+    queued = mail_queue.send(
+        "order_receipt",
+        user.email,
+        username=user.username,
+        orders=orders,
+        grand_total=sum(order["grand_total"] for order in orders),
+    )
+    if not queued:
+        raise RuntimeError("Mail queue unavailable")
@@ -0,0 +1,199 @@
+import smtplib
+import ssl
+import time
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from email.utils import make_msgid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from jinja2 import (
+    Environment,
+    FileSystemLoader,
+    Template,
+    TemplateNotFound,
+    select_autoescape,
+)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+
+@dataclass
+class OutgoingMail:
+    """
+    One rendered message waiting in the mail queue.
+    """
+
+    to: str
+    subject: str
+    text: str
+    html: Optional[str] = None
+    attempts: int = 0
+    message_id: str = field(default_factory=make_msgid)
+
+
+class MailTemplates:
+    """
+    Jinja2 email templates, compiled once when loaded instead of on every
+    send. An email `name` is `name.txt`, whose `subject` and `body` blocks
+    give the subject and plain-text part, plus an optional autoescaped
+    `name.html` for the html part.
+    """
+
+    def __init__(self, directory: Path = TEMPLATE_DIR):
+        self.env = Environment(
+            loader=FileSystemLoader(str(directory)),
+            autoescape=select_autoescape(["html"]),
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        self._templates: Dict[str, Template] = {}
+
+    def load(self) -> None:
+        """
+        Compiles every template up front; call at startup so a broken template
+        fails the boot instead of a send.
+        """
+        for name in self.env.list_templates(extensions=["txt", "html"]):
+            self._templates[name] = self.env.get_template(name)
+
+    def _get(self, filename: str) -> Optional[Template]:
+        if filename not in self._templates:
+            try:
+                self._templates[filename] = self.env.get_template(filename)
+            except TemplateNotFound:
+                return None
+        return self._templates[filename]
+
+    def render(self, name: str, to: str, **context) -> OutgoingMail:
+        text = self._get(f"{name}.txt")
+        if text is None:
+            raise TemplateNotFound(f"{name}.txt")
+        ctx = text.new_context(context)
+        subject = "".join(text.blocks["subject"](ctx))
+        body = "".join(text.blocks["body"](ctx)).strip()
+        html = self._get(f"{name}.html")
+        return OutgoingMail(
+            to=to,
+            subject=" ".join(subject.split()),
+            text=body,
+            html=html.render(context) if html is not None else None,
+        )
+
+
+def build_message(mail: OutgoingMail, sender: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = mail.to
+    message["Subject"] = mail.subject
+    message["Message-ID"] = mail.message_id
+    message.set_content(mail.text)
+    if mail.html:
+        message.add_alternative(mail.html, subtype="html")
+    return message
+
+
+def is_permanent(error: Exception) -> bool:
+    """
+    True for failures retrying can't fix: refused recipients/sender and other
+    5xx replies. Network errors and 4xx replies are worth another attempt.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class SmtpConnection:
+    """
+    One reusable, blocking SMTP connection. Sends batches over the same
+    session, reconnecting when the server has dropped it or it sat idle past
+    `max_idle`. Meant to be driven from a worker thread (asyncio.to_thread),
+    one connection per sender so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        use_ssl: bool = False,
+        timeout: float = 10.0,
+        max_idle: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(
+                self.host,
+                self.port,
+                timeout=self.timeout,
+                context=ssl.create_default_context(),
+            )
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        return smtp
+
+    def _session(self) -> smtplib.SMTP:
+        if (
+            self._smtp is not None
+            and time.monotonic() - self._last_used > self.max_idle
+        ):
+            self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def send_batch(self, messages: List[EmailMessage]) -> List[Optional[Exception]]:
+        """
+        Sends `messages` in order; returns None for each delivered message and
+        the error for each failed one. A dropped connection is re-opened
+        once per message before giving up on it.
+        """
+        results: List[Optional[Exception]] = []
+        for message in messages:
+            error = None
+            for _ in range(2):
+                try:
+                    self._session().send_message(message)
+                    error = None
+                    break
+                except smtplib.SMTPServerDisconnected as exc:
+                    self.close()
+                    error = exc
+                except smtplib.SMTPException as exc:
+                    # The server answered; resending right away won't help
+                    error = exc
+                    break
+                except OSError as exc:
+                    self.close()
+                    error = exc
+            self._last_used = time.monotonic()
+            results.append(error)
+        return results
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
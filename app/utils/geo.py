@@ -0,0 +1,33 @@
+from math import asin, cos, radians, sin, sqrt
+from typing import List, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+Point = Tuple[float, float]
+
+
+def haversine_km(origin: Point, point: Point) -> float:
+    """
+    Great-circle distance in km between two (latitude, longitude) points.
+    """
+    return distances_km(origin, [point])[0]
+
+
+def distances_km(origin: Point, points: Sequence[Point]) -> List[float]:
+    """
+    Great-circle distances in km from `origin` to each of `points`, in order.
+
+    The origin's trigonometry is computed once for the whole batch, leaving
+    one cos per point for the latitude term and the haversine itself.
+    """
+    lat0, lon0 = radians(origin[0]), radians(origin[1])
+    cos_lat0 = cos(lat0)
+    distances = []
+    for lat, lon in points:
+        lat, lon = radians(lat), radians(lon)
+        h = (
+            sin((lat - lat0) / 2) ** 2
+            + cos_lat0 * cos(lat) * sin((lon - lon0) / 2) ** 2
+        )
+        distances.append(2 * EARTH_RADIUS_KM * asin(sqrt(min(1.0, h))))
+    return distances
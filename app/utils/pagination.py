@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+
+
+def encode_cursor(payload: dict) -> str:
+    """
+    Packs keyset values into an opaque, URL-safe cursor string.
+    """
+    raw = json.dumps(
+        payload,
+        separators=(",", ":"),
+        default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Reverses encode_cursor. Raises a 400 for anything that isn't one of our cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload
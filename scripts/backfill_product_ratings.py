@@ -0,0 +1,27 @@
+# scripts/backfill_product_ratings.py
+"""
+Rebuilds Product.rating_sum / rating_count from the review table.
+
+Usage:
+    python -m scripts.backfill_product_ratings            # whole catalog
+    python -m scripts.backfill_product_ratings 12 34 56   # specific products
+"""
+
+import asyncio
+import sys
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.ratings_service import recompute_product_ratings
+
+
+async def backfill_product_ratings(product_ids=None):
+    async with AsyncSessionLocal() as session:
+        updated = await recompute_product_ratings(session, product_ids)
+        await session.commit()
+    await engine.dispose()
+    print(f"Rating aggregates rebuilt ({updated} reviewed products).")
+
+
+if __name__ == "__main__":
+    ids = [int(arg) for arg in sys.argv[1:]] or None
+    asyncio.run(backfill_product_ratings(ids))
@@ -0,0 +1,67 @@
+# scripts/bench_category_queries.py
+"""
+Counts the SQL statements issued by the category read endpoints as the page
+size grows. The statement count must stay flat: a category read may never
+fan out into its products (or their stores / vendors).
+
+Usage:
+    python -m scripts.bench_category_queries             # limits 1, 10, 100
+    python -m scripts.bench_category_queries 5 50 500    # custom limits
+"""
+
+import asyncio
+import sys
+import time
+
+import httpx
+from sqlalchemy import event
+
+from app.core.cache import catalog_cache
+from app.db.session import engine
+from app.main import app
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+async def measure(client: httpx.AsyncClient, counter: StatementCounter, url: str):
+    # Every request must reach the database, not the response cache
+    await catalog_cache.invalidate("categories")
+    counter.count = 0
+    started = time.perf_counter()
+    response = await client.get(url)
+    elapsed = (time.perf_counter() - started) * 1000
+    response.raise_for_status()
+    return counter.count, len(response.json()), elapsed
+
+
+async def bench_category_queries(limits):
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            print(f"{'endpoint':<48}{'rows':>6}{'queries':>9}{'ms':>9}")
+            for limit in limits:
+                for with_counts in (False, True):
+                    url = (
+                        f"/categories/allcategories?limit={limit}"
+                        f"&with_counts={str(with_counts).lower()}"
+                    )
+                    queries, rows, elapsed = await measure(client, counter, url)
+                    print(f"{url:<48}{rows:>6}{queries:>9}{elapsed:>9.1f}")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    limits = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    asyncio.run(bench_category_queries(limits))
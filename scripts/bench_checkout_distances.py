@@ -0,0 +1,51 @@
+# scripts/bench_checkout_distances.py
+"""
+Times the delivery-distance computation behind checkout_data for carts that
+span a growing number of stores: the batched app.utils.geo.distances_km
+against calling haversine_km once per store. Coordinates are random, so no
+database is needed.
+
+Usage:
+    python -m scripts.bench_checkout_distances                  # 1, 10, 100, 1000, 10000 stores
+    python -m scripts.bench_checkout_distances 50 500           # custom store counts
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from app.utils.geo import distances_km, haversine_km
+
+ROUNDS = 20
+
+
+def random_point():
+    return random.uniform(-90, 90), random.uniform(-180, 180)
+
+
+def timed(fn) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def bench_checkout_distances(sizes):
+    print(f"{'stores':>7}{'batch ms':>10}{'per-pair ms':>13}{'max diff km':>13}")
+    for size in sizes:
+        origin = random_point()
+        stores = [random_point() for _ in range(size)]
+        batch = distances_km(origin, stores)
+        pairs = [haversine_km(origin, store) for store in stores]
+        diff = max(abs(a - b) for a, b in zip(batch, pairs))
+        batch_ms = timed(lambda: distances_km(origin, stores))
+        pairs_ms = timed(lambda: [haversine_km(origin, store) for store in stores])
+        print(f"{size:>7}{batch_ms:>10.3f}{pairs_ms:>13.3f}{diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100, 1000, 10000]
+    bench_checkout_distances(sizes)
@@ -0,0 +1,80 @@
+# scripts/bench_place_order.py
+"""
+Times orders_service.place_order and counts its SQL statements for carts of
+growing size, built from in-stock products already in the database. Every run
+is rolled back, so nothing is written.
+
+Usage:
+    python -m scripts.bench_place_order USER_ID                 # 1, 5, 20, 50, 100, 200 items
+    python -m scripts.bench_place_order USER_ID 10 400          # custom cart sizes
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy import event
+from sqlmodel import select
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.product import Product
+from app.schemas.order_schema import CheckoutItem
+from app.services.orders_service import place_order
+
+ROUNDS = 5
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+async def bench_place_order(user_id: int, sizes):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Product.id)
+            .where(Product.is_active, Product.stock > 0)
+            .order_by(Product.id)
+            .limit(max(sizes))
+        )
+        product_ids = result.scalars().all()
+    if not product_ids:
+        print("No active products to build carts from.")
+        return
+
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        print(f"{'items':>6}{'queries':>9}{'median ms':>11}{'max ms':>9}")
+        for size in sizes:
+            cart = [
+                CheckoutItem(product_id=str(pid), quantity=1)
+                for pid in product_ids[:size]
+            ]
+            timings = []
+            for _ in range(ROUNDS):
+                async with AsyncSessionLocal() as session:
+                    counter.count = 0
+                    started = time.perf_counter()
+                    await place_order(session, user_id, cart)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    queries = counter.count
+                    await session.rollback()
+            print(
+                f"{len(cart):>6}{queries:>9}"
+                f"{statistics.median(timings):>11.1f}{max(timings):>9.1f}"
+            )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    sizes = [int(arg) for arg in sys.argv[2:]] or [1, 5, 20, 50, 100, 200]
+    asyncio.run(bench_place_order(int(sys.argv[1]), sizes))
@@ -0,0 +1,94 @@
+# scripts/stress_stock_reservation.py
+"""
+Fires many concurrent one-unit checkouts at a single product and checks that
+stock is never oversold: exactly min(stock, checkouts) succeed and the final
+stock matches. The product's original stock is restored afterwards.
+
+Usage:
+    python -m scripts.stress_stock_reservation PRODUCT_ID                 # 100 units, 500 checkouts
+    python -m scripts.stress_stock_reservation PRODUCT_ID 50 1000 64      # units, checkouts, concurrency
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.product import Product
+from app.services.inventory_service import take_stock
+
+
+async def checkout(product_id: int, slots: asyncio.Semaphore, latencies: list) -> bool:
+    async with slots:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            try:
+                await take_stock(session, {product_id: 1})
+                await session.commit()
+                sold = True
+            except HTTPException:
+                await session.rollback()
+                sold = False
+        latencies.append((time.perf_counter() - started) * 1000)
+        return sold
+
+
+async def set_stock(product_id: int, stock: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(Product).where(Product.id == product_id).values(stock=stock)
+        )
+        await session.commit()
+
+
+async def stress(product_id: int, units: int, checkouts: int, concurrency: int):
+    async with AsyncSessionLocal() as session:
+        original = await session.scalar(
+            select(Product.stock).where(Product.id == product_id)
+        )
+    if original is None:
+        sys.exit(f"Product {product_id} not found")
+
+    await set_stock(product_id, units)
+    try:
+        slots = asyncio.Semaphore(concurrency)
+        latencies: list = []
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(checkout(product_id, slots, latencies) for _ in range(checkouts))
+        )
+        elapsed = time.perf_counter() - started
+
+        async with AsyncSessionLocal() as session:
+            final = await session.scalar(
+                select(Product.stock).where(Product.id == product_id)
+            )
+    finally:
+        await set_stock(product_id, original)
+        await engine.dispose()
+
+    sold = sum(results)
+    expected = min(units, checkouts)
+    print(f"checkouts:   {checkouts} ({concurrency} in flight)")
+    print(f"sold:        {sold} (expected {expected})")
+    print(f"final stock: {final} (expected {units - expected})")
+    print(f"throughput:  {checkouts / elapsed:.0f} checkouts/s")
+    print(
+        f"latency ms:  median {statistics.median(latencies):.1f}, "
+        f"p99 {sorted(latencies)[int(len(latencies) * 0.99) - 1]:.1f}"
+    )
+    if sold != expected or final != units - expected:
+        sys.exit("OVERSOLD or lost updates detected")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    args = [int(arg) for arg in sys.argv[1:]]
+    product_id, units, checkouts, concurrency = args + [100, 500, 32][len(args) - 1 :]
+    asyncio.run(stress(product_id, units, checkouts, concurrency))
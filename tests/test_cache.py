@@ -0,0 +1,100 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlmodel import update
+
+from app.core import cache
+from app.core.cache import MemoryCache, ResponseCache, catalog_cache
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.product import Product
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Stands in for the cache module's clock; advance it with clock[0].
+    """
+    now = [1000.0]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_their_ttl(clock):
+    backend = MemoryCache()
+    await backend.set("short", 1, ttl=10, tags=["t"])
+    await backend.set("long", 2, ttl=60, tags=["t"])
+
+    clock[0] += 30
+
+    assert await backend.get("short") is None
+    assert await backend.get("long") == 2
+    # The expired key is gone from the tag index too
+    assert backend._tags["t"] == {"long"}
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    backend = MemoryCache(max_entries=2)
+    await backend.set("a", 1, ttl=60, tags=[])
+    await backend.set("b", 2, ttl=60, tags=[])
+    await backend.get("a")
+
+    await backend.set("c", 3, ttl=60, tags=[])
+
+    assert await backend.get("b") is None
+    assert (await backend.get("a"), await backend.get("c")) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_invalidating_a_tag_drops_every_dependent_key():
+    responses = ResponseCache(MemoryCache(), default_ttl=60)
+    await responses.set("products:list:page1", [1, 2], tags=["products"])
+    await responses.set("products:list:page2", [3], tags=["products"])
+    await responses.set("products:detail:1", {"id": 1}, tags=["product:1"])
+    await responses.set("products:detail:2", {"id": 2}, tags=["product:2"])
+
+    await responses.invalidate("products", "product:1")
+
+    assert await responses.get("products:list:page1") is None
+    assert await responses.get("products:list:page2") is None
+    assert await responses.get("products:detail:1") is None
+    assert await responses.get("products:detail:2") == {"id": 2}
+    assert responses.stats()["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_product_etag_answers_304_until_the_product_changes(make_product):
+    product_id = await make_product(price=12.0)
+    url = f"/products/{product_id}"
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get(url)
+        etag = first.headers["etag"]
+        cached = await client.get(url, headers={"If-None-Match": etag})
+        weak = await client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+        await catalog_cache.backend.clear()
+        uncached = await client.get(url, headers={"If-None-Match": etag})
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Product)
+                .where(Product.id == product_id)
+                .values(price=15.0, updated_at=datetime.now())
+            )
+            await session.commit()
+        await catalog_cache.invalidate(f"product:{product_id}")
+        changed = await client.get(url, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert (cached.status_code, cached.content) == (304, b"")
+    assert cached.headers["etag"] == etag
+    assert weak.status_code == 304
+    assert uncached.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["price"] == 15.0
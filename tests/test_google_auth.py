@@ -0,0 +1,141 @@
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.google_auth import (
+    GoogleTokenError,
+    GoogleTokenVerifier,
+    StaticKeySource,
+)
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+
+class SigningKey:
+    """
+    A locally generated RSA key standing in for one of Google's.
+    """
+
+    def __init__(self, kid: str):
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.kid = kid
+        self.pem = private.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        public = jwk.construct(self.pem, "RS256").public_key().to_dict()
+        self.jwk = {**public, "kid": kid, "use": "sig"}
+
+    def sign(self, **claims) -> str:
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "sub": "1234567890",
+            "email": "buyer@example.com",
+            "iat": now,
+            "exp": now + 3600,
+            **claims,
+        }
+        return jwt.encode(
+            payload, self.pem, algorithm="RS256", headers={"kid": self.kid}
+        )
+
+
+class CountingKeySource(StaticKeySource):
+    def __init__(self, *keys: SigningKey):
+        super().__init__({"keys": [key.jwk for key in keys]})
+        self.fetches = 0
+
+    async def fetch(self):
+        self.fetches += 1
+        return await super().fetch()
+
+
+@pytest.fixture(scope="module")
+def google_key():
+    return SigningKey("current")
+
+
+@pytest.fixture(scope="module")
+def rotated_key():
+    return SigningKey("rotated")
+
+
+@pytest.mark.asyncio
+async def test_valid_token_is_accepted(google_key):
+    verifier = GoogleTokenVerifier(CLIENT_ID, CountingKeySource(google_key))
+
+    claims = await verifier.verify(google_key.sign())
+
+    assert claims["email"] == "buyer@example.com"
+    assert claims["aud"] == CLIENT_ID
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"aud": "someone-else.apps.googleusercontent.com"},
+        {"iss": "https://evil.example.com"},
+        {"iat": int(time.time()) - 7200, "exp": int(time.time()) - 3600},
+    ],
+    ids=["wrong-aud", "wrong-iss", "expired"],
+)
+async def test_invalid_claims_are_rejected(google_key, claims):
+    verifier = GoogleTokenVerifier(CLIENT_ID, CountingKeySource(google_key))
+
+    with pytest.raises(GoogleTokenError):
+        await verifier.verify(google_key.sign(**claims))
+
+
+@pytest.mark.asyncio
+async def test_token_signed_by_another_key_is_rejected(google_key, rotated_key):
+    # Claims a known kid but carries someone else's signature
+    forged = jwt.encode(
+        {"aud": CLIENT_ID, "iss": "accounts.google.com", "exp": time.time() + 60},
+        rotated_key.pem,
+        algorithm="RS256",
+        headers={"kid": google_key.kid},
+    )
+    verifier = GoogleTokenVerifier(CLIENT_ID, CountingKeySource(google_key))
+
+    with pytest.raises(GoogleTokenError):
+        await verifier.verify(forged)
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refreshes_once_then_is_rejected(google_key, rotated_key):
+    source = CountingKeySource(google_key)
+    verifier = GoogleTokenVerifier(CLIENT_ID, source, retry_after=30)
+    await verifier.verify(google_key.sign())
+    assert source.fetches == 1
+
+    # Past the throttle window an unknown kid triggers one refresh ...
+    verifier._fetched_at -= verifier.retry_after
+    with pytest.raises(GoogleTokenError, match="Unknown signing key"):
+        await verifier.verify(rotated_key.sign())
+    assert source.fetches == 2
+
+    # ... and within it, further unknown kids are rejected without fetching
+    for _ in range(5):
+        with pytest.raises(GoogleTokenError, match="Unknown signing key"):
+            await verifier.verify(rotated_key.sign())
+    assert source.fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_rotated_key_is_picked_up_by_the_refresh(google_key, rotated_key):
+    source = CountingKeySource(google_key)
+    verifier = GoogleTokenVerifier(CLIENT_ID, source, retry_after=0)
+    await verifier.verify(google_key.sign())
+
+    source.jwks = {"keys": [google_key.jwk, rotated_key.jwk]}
+    claims = await verifier.verify(rotated_key.sign())
+
+    assert claims["sub"] == "1234567890"
+    assert source.fetches == 2
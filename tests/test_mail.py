@@ -0,0 +1,104 @@
+import asyncio
+import socket
+
+import pytest
+
+from app.tasks.send_mail import MailQueue
+
+Controller = pytest.importorskip("aiosmtpd.controller").Controller
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """
+    Local SMTP stand-in: accepts everything except recipients at
+    bounce.example.com, which get a permanent 550.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.connections = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.endswith("@bounce.example.com"):
+            return "550 5.1.1 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.connections.add(session.peer)
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+def make_queue(host: str, port: int, **kwargs) -> MailQueue:
+    return MailQueue(smtp_host=host, smtp_port=port, smtp_starttls=False, **kwargs)
+
+
+async def wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_mails_go_out_in_batches_over_reused_connections(smtp_server):
+    queue = make_queue(smtp_server.hostname, smtp_server.port, senders=2, batch_size=10)
+    queue.start()
+    recipients = [f"user{n}@example.com" for n in range(24)]
+    for to in recipients:
+        assert queue.send("welcome", to, username="Amani")
+    await queue.stop(timeout=10)
+
+    handler = smtp_server.handler
+    assert queue.stats()["sent"] == len(recipients)
+    assert queue.stats()["retried"] == 0
+    assert sorted(m.rcpt_tos[0] for m in handler.messages) == sorted(recipients)
+    # One connection per sender, reused for all of its batches
+    assert 1 <= len(handler.connections) <= 2
+
+
+@pytest.mark.asyncio
+async def test_permanent_rejection_is_not_retried(smtp_server):
+    queue = make_queue(smtp_server.hostname, smtp_server.port, senders=2)
+    queue.start()
+    assert queue.send("welcome", "gone@bounce.example.com")
+    assert queue.send("welcome", "here@example.com")
+    await queue.stop(timeout=10)
+
+    stats = queue.stats()
+    assert (stats["sent"], stats["failed"], stats["retried"]) == (1, 1, 0)
+    assert [m.rcpt_tos for m in smtp_server.handler.messages] == [["here@example.com"]]
+
+
+@pytest.mark.asyncio
+async def test_refused_connection_is_retried_with_backoff():
+    queue = make_queue(
+        "127.0.0.1", free_port(), senders=1, max_attempts=3, retry_delay=0.05
+    )
+    queue.start()
+    started = asyncio.get_running_loop().time()
+    assert queue.send("welcome", "user@example.com")
+    await wait_for(lambda: queue.stats()["failed"] == 1)
+    elapsed = asyncio.get_running_loop().time() - started
+    await queue.stop(timeout=1)
+
+    stats = queue.stats()
+    assert (stats["sent"], stats["retried"], stats["failed"]) == (0, 2, 1)
+    # Waited retry_delay * 2 before the second attempt, * 4 before the third
+    assert elapsed >= 0.05 * 2 + 0.05 * 4
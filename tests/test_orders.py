@@ -0,0 +1,211 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, insert
+from sqlmodel import select
+
+from app.core.jwt import create_access_token
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.inventory import StockReservation
+from app.models.order import Order
+from app.models.product import Product
+from app.services.inventory_service import take_stock
+
+PARALLEL_ORDERS = 200
+
+
+async def product_stock(product_id: int) -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(
+            select(Product.stock).where(Product.id == product_id)
+        )
+
+
+async def count_rows(model) -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stock", [50, PARALLEL_ORDERS + 10])
+async def test_parallel_take_stock_never_oversells(make_product, stock):
+    product_id = await make_product(stock=stock)
+
+    async def buy_one() -> int:
+        async with AsyncSessionLocal() as session:
+            try:
+                await take_stock(session, {product_id: 1})
+            except HTTPException as exc:
+                await session.rollback()
+                return exc.status_code
+            await session.commit()
+            return 200
+
+    statuses = await asyncio.gather(*(buy_one() for _ in range(PARALLEL_ORDERS)))
+
+    assert set(statuses) <= {200, 409}
+    sold = statuses.count(200)
+    assert sold == min(stock, PARALLEL_ORDERS)
+    assert await product_stock(product_id) == stock - sold
+
+
+@pytest.mark.asyncio
+async def test_parallel_checkouts_sell_exactly_the_stock(make_product, make_users):
+    stock = 50
+    product_id = await make_product(stock=stock)
+    user_ids = await make_users(PARALLEL_ORDERS)
+    cart = [{"product_id": str(product_id), "quantity": 1}]
+
+    async def checkout(client: AsyncClient, user_id: int) -> int:
+        headers = {"Authorization": f"Bearer {create_access_token(user_id, False)}"}
+        response = await client.post(
+            "/checkout_confirm",
+            json={"data": cart, "phone": "+254700000000"},
+            headers=headers,
+        )
+        if response.status_code != 200:
+            return response.status_code
+        confirmed = response.json()
+        response = await client.post(
+            "/place_order",
+            json={
+                "order_ref": confirmed["order"],
+                "token": confirmed["token"],
+                "cart": cart,
+            },
+            headers=headers,
+        )
+        return response.status_code
+
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        statuses = await asyncio.gather(*(checkout(client, uid) for uid in user_ids))
+
+    assert 500 not in statuses
+    assert set(statuses) <= {200, 409}
+    sold = statuses.count(200)
+    assert sold == min(stock, PARALLEL_ORDERS)
+    assert await product_stock(product_id) == stock - sold
+    assert await count_rows(Order) == sold
+    assert await count_rows(StockReservation) == 0
+
+
+@pytest.mark.asyncio
+async def test_place_order_retry_replays_after_cart_is_cleared(
+    make_product, make_users
+):
+    product_id = await make_product(stock=5)
+    (user_id,) = await make_users(1)
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, False)}"}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/cart/items",
+            json={"product_id": product_id, "quantity": 2},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        # An empty cart in the request means the stored cart
+        response = await client.post(
+            "/checkout_confirm",
+            json={"data": [], "phone": "+254700000000"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        confirmed = response.json()
+        place = {
+            "order_ref": confirmed["order"],
+            "token": confirmed["token"],
+            "cart": [],
+        }
+
+        first = await client.post("/place_order", json=place, headers=headers)
+        assert first.status_code == 200
+        assert (await client.get("/cart", headers=headers)).json()["items"] == []
+        retry = await client.post("/place_order", json=place, headers=headers)
+
+    assert retry.status_code == 200
+    assert retry.json()["orders"] == first.json()["orders"]
+    assert await count_rows(Order) == 1
+    assert await product_stock(product_id) == 3
+
+
+@pytest.mark.asyncio
+async def test_reconfirming_overlapping_carts_in_opposite_order(
+    make_product, make_users
+):
+    # Each buyer swaps a held product for the other one, half of them each
+    # way, so one transaction returns B and takes A while another returns A
+    # and takes B. Both must lock the rows in the same order.
+    stock = 500
+    first, second = await make_product(stock=stock), await make_product(stock=stock)
+    user_ids = await make_users(PARALLEL_ORDERS)
+    swaps = {
+        user_id: (second, first) if n % 2 else (first, second)
+        for n, user_id in enumerate(user_ids)
+    }
+
+    async def confirm(client: AsyncClient, user_id: int, product_id: int) -> int:
+        response = await client.post(
+            "/checkout_confirm",
+            json={
+                "data": [{"product_id": str(product_id), "quantity": 1}],
+                "phone": "+254700000000",
+            },
+            headers={"Authorization": f"Bearer {create_access_token(user_id, False)}"},
+        )
+        return response.status_code
+
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        held = await asyncio.gather(
+            *(confirm(client, uid, old) for uid, (old, _) in swaps.items())
+        )
+        assert set(held) == {200}
+        statuses = await asyncio.gather(
+            *(confirm(client, uid, new) for uid, (_, new) in swaps.items())
+        )
+
+    assert set(statuses) == {200}
+    assert await count_rows(StockReservation) == PARALLEL_ORDERS
+    assert await product_stock(first) == stock - PARALLEL_ORDERS // 2
+    assert await product_stock(second) == stock - PARALLEL_ORDERS // 2
+
+
+@pytest.mark.asyncio
+async def test_get_orders_lists_everything_unless_cursor_paging(store, make_users):
+    (user_id,) = await make_users(1)
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            insert(Order),
+            [{"user_id": user_id, "store_id": store["id"]} for _ in range(25)],
+        )
+        await session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, False)}"}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        listed = await client.post("/get_orders", headers=headers)
+        pages, cursor = [], None
+        while True:
+            response = await client.post(
+                "/get_orders",
+                json={"pagination": "cursor", "cursor": cursor, "limit": 10},
+                headers=headers,
+            )
+            page = response.json()
+            pages.append(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    assert listed.status_code == 200
+    assert isinstance(listed.json(), list) and len(listed.json()) == 25
+    assert [len(items) for items in pages] == [10, 10, 5]
+    assert [order["id"] for items in pages for order in items] == [
+        order["id"] for order in listed.json()
+    ]
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlmodel import delete
+
+from app.core.jwt import create_access_token
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.user import Permission, Role, RolePermissionLink, UserRoleLink
+from app.routers import auth
+from app.services import permissions_service
+from app.services.permissions_service import PermissionEngine
+
+TTL = 60
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    A fresh engine for the app on a fake clock; advance it with clock[0].
+    """
+    now = [1000.0]
+    monkeypatch.setattr(
+        permissions_service, "time", SimpleNamespace(monotonic=lambda: now[0])
+    )
+    monkeypatch.setattr(auth, "permission_engine", PermissionEngine(ttl=TTL))
+    return now
+
+
+@pytest_asyncio.fixture
+async def category_manager(make_users):
+    """
+    A user holding category:manage through a role.
+    """
+    (user_id,) = await make_users(1)
+    async with AsyncSessionLocal() as session:
+        role = Role(name="merchandiser")
+        permission = Permission(name="Manage categories", code="category:manage")
+        session.add_all([role, permission])
+        await session.flush()
+        session.add_all(
+            [
+                RolePermissionLink(role_id=role.id, permission_id=permission.id),
+                UserRoleLink(user_id=user_id, role_id=role.id),
+            ]
+        )
+        await session.commit()
+    return user_id
+
+
+async def revoke_role_permissions() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(RolePermissionLink))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_revoked_permission_applies_within_the_cache_ttl(clock, category_manager):
+    headers = {
+        "Authorization": f"Bearer {create_access_token(category_manager, False)}"
+    }
+
+    async def create(client: AsyncClient, slug: str) -> int:
+        response = await client.post(
+            "/categories/", json={"name": slug, "slug": slug}, headers=headers
+        )
+        return response.status_code
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert await create(client, "before") == 200
+        await revoke_role_permissions()
+        # Still cached in this worker ...
+        assert await create(client, "cached") == 200
+        # ... until the entry expires
+        clock[0] += TTL + 1
+        assert await create(client, "expired") == 403
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_applies_a_revocation_at_once(clock, category_manager):
+    engine = auth.permission_engine
+    async with AsyncSessionLocal() as session:
+        assert await engine.has_permission(session, category_manager, "category:manage")
+        await revoke_role_permissions()
+        engine.invalidate_user(category_manager)
+        assert not await engine.has_permission(
+            session, category_manager, "category:manage"
+        )
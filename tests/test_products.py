@@ -0,0 +1,123 @@
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, insert
+
+from app.core.cache import catalog_cache
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.product import Category, Product, ProductImage
+from app.services.category_tree import child_path, subtree_ids_query
+
+CATALOG_SIZE = 30
+IMAGES_PER_PRODUCT = 3
+
+
+@pytest.fixture
+def statements(db_engine):
+    """
+    SQL statements the app's engine sends while the test runs.
+    """
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest_asyncio.fixture
+async def catalog(make_product):
+    product_ids = [await make_product(price=10.0 + i) for i in range(CATALOG_SIZE)]
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            insert(ProductImage),
+            [
+                {
+                    "product_id": product_id,
+                    "image_url": f"uploads/{product_id}-{n}.jpg",
+                    "is_main": n == 0,
+                }
+                for product_id in product_ids
+                for n in range(IMAGES_PER_PRODUCT)
+            ],
+        )
+        await session.commit()
+    return product_ids
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pagination", ["offset", "cursor"])
+async def test_product_page_statement_count_is_constant(
+    catalog, statements, pagination
+):
+    counts = {}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for limit in (1, 5, CATALOG_SIZE):
+            await catalog_cache.backend.clear()
+            statements.clear()
+            response = await client.post(
+                "/products/get_products",
+                json={"limit": limit, "pagination": pagination},
+            )
+            assert response.status_code == 200
+            body = response.json()
+            items = body["items"] if pagination == "cursor" else body
+            assert len(items) == limit
+            assert all(len(item["images"]) == IMAGES_PER_PRODUCT for item in items)
+            counts[limit] = len(statements)
+
+    # The display query plus one query for the images of the whole page
+    assert set(counts.values()) == {2}, counts
+
+
+@pytest.mark.asyncio
+async def test_descendant_filter_matches_the_subtree_by_literal_prefix(store):
+    # root -> child -> grandchild, plus a sibling of root, one product each
+    async with AsyncSessionLocal() as session:
+        root = await session.get(Category, store["category_id"])
+        categories = {"root": root}
+        for name, parent in (
+            ("child", "root"),
+            ("grandchild", "child"),
+            ("other", None),
+        ):
+            category = Category(
+                name=name, slug=name, parent_id=parent and categories[parent].id
+            )
+            session.add(category)
+            await session.flush()
+            category.path = child_path(parent and categories[parent].path, category.id)
+            categories[name] = category
+        for name, category in categories.items():
+            session.add(
+                Product(
+                    store_id=store["id"],
+                    category_id=category.id,
+                    name=f"In {name}",
+                    slug=f"in-{name}",
+                    price=10.0,
+                )
+            )
+        await session.commit()
+
+        subtree = await subtree_ids_query(session, root.id)
+        sql = str(subtree.compile(compile_kwargs={"literal_binds": True}))
+        assert f"LIKE '{root.path}%'" in sql
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/products/get_products",
+            json={"category_id": root.id, "include_descendants": True},
+        )
+
+    assert response.status_code == 200
+    assert sorted(item["title"] for item in response.json()) == [
+        "In child",
+        "In grandchild",
+        "In root",
+    ]
@@ -0,0 +1,68 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlmodel import select, update
+
+from app.core.jwt import create_access_token
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.product import Product
+
+
+async def rating_totals(product_id: int):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Product.rating_sum, Product.rating_count).where(
+                Product.id == product_id
+            )
+        )
+        return tuple(result.one())
+
+
+@pytest.mark.asyncio
+async def test_review_updates_keep_rating_totals(make_product, make_users):
+    product_id = await make_product()
+    (user_id,) = await make_users(1)
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, False)}"}
+    url = f"/products/{product_id}/reviews"
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            url, json={"product_id": product_id, "rating": 4}, headers=headers
+        )
+        assert response.status_code == 200
+        review_url = f"/reviews/{response.json()['id']}"
+
+        cleared = await client.put(review_url, json={"rating": None}, headers=headers)
+        commented = await client.put(
+            review_url, json={"comment": "Still good"}, headers=headers
+        )
+        rerated = await client.put(review_url, json={"rating": 2}, headers=headers)
+
+    assert cleared.status_code == 422
+    assert commented.status_code == 200
+    assert commented.json()["rating"] == 4
+    assert rerated.status_code == 200
+    assert await rating_totals(product_id) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_inactive_product_cannot_be_reviewed(make_product, make_users):
+    product_id = await make_product()
+    (user_id,) = await make_users(1)
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(Product).where(Product.id == product_id).values(is_active=False)
+        )
+        await session.commit()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            f"/products/{product_id}/reviews",
+            json={"product_id": product_id, "rating": 5},
+            headers={"Authorization": f"Bearer {create_access_token(user_id, False)}"},
+        )
+
+    assert response.status_code == 404
+    assert await rating_totals(product_id) == (0, 0)